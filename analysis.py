@@ -1,48 +1,125 @@
 import itertools
 import json
 import os
-import statistics
+import pickle
+import re
+from dataclasses import dataclass
+from multiprocessing import Pool
 
 import numpy as np
 import yaml
 import pathlib
-from matplotlib import pyplot as plt
 
 import jsonpickle
 
-from evaluation import validate_sudoku
+import results_store
+from evaluation import validate_population
 
 error_files = []
 
+# jsonpickle encoding of tuples of numbers, e.g. fitness values in 'Partial scores'
+_PY_TUPLE = re.compile(r'\{"py/tuple": (\[[^\[\]{}]*\])\}')
+# below this amount of files parsing in worker processes does not pay off
+PARALLEL_LOADING_THRESHOLD = 64
+
+DIFFICULTY_LEVEL_FILTERS = {
+    '01_easy': lambda x: 0 <= int(x) < 50,
+    '02_medium': lambda x: 50 <= int(x) < 100,
+    '03_advanced': lambda x: 100 <= int(x) < 150,
+    '04_hard': lambda x: 150 <= int(x) < 200,
+}
+
+
+def parse_result(text: str):
+    """
+    SolutionTracer writes only dicts, lists and fitness tuples, such payloads are decoded with plain json
+    (tuples become lists), jsonpickle is used only when there are other type tags
+    """
+    tags = text.count('"py/')
+    if tags > 0 and tags == text.count('"py/tuple"'):
+        text = _PY_TUPLE.sub(r'\1', text)
+        tags = text.count('"py/')
+    return json.loads(text) if tags == 0 else jsonpickle.loads(text)
+
 
 def load_json(path):
     try:
         with open(path) as f:
-            return jsonpickle.loads(f.read())
+            return parse_result(f.read())
     except json.decoder.JSONDecodeError:
         error_files.append(path)
         return None
 
 
+def _load_compressed(path) -> tuple:
+    try:
+        with open(path) as f:
+            result = parse_result(f.read())
+    except json.decoder.JSONDecodeError:
+        return path, None, True
+    return path, compress_result(result) if 'Solution' in result else None, False
+
+
+def load_results(paths: list, processes: int = None, chunksize: int = 32):
+    """
+    Parses result files in chunks in worker processes, runs are compressed (see compress_result) before
+    they are sent back, runs which ended without solution are None
+    :return: generator of (path, run) in order of paths
+    """
+    if len(paths) < PARALLEL_LOADING_THRESHOLD:
+        parsed = map(_load_compressed, paths)
+        yield from _collect_errors(parsed)
+    else:
+        with Pool(processes) as pool:
+            yield from _collect_errors(pool.imap(_load_compressed, paths, chunksize=chunksize))
+
+
+def _collect_errors(parsed):
+    for path, run, failed in parsed:
+        if failed:
+            error_files.append(path)
+        yield path, run
+
+
+def iter_instances_results(rootdir: str, instances_filter=lambda x: True, processes: int = None):
+    """
+    Streaming counterpart of get_instances_results, results of instance are yielded as soon as all its files
+    are parsed, so they can be consumed by calculate_statistics while the rest is still being parsed
+    :return: generator of (instance id, [compressed runs])
+    """
+    root = pathlib.Path(rootdir)
+    instance_ids = [instance_id for instance_id in sorted(os.listdir(root)) if instances_filter(instance_id)]
+    paths = [(instance_id, root / instance_id / file) for instance_id in instance_ids
+             for file in sorted(os.listdir(root / instance_id))]
+    runs = load_results([path for _, path in paths], processes)
+    for instance_id, group in itertools.groupby(paths, key=lambda pair: pair[0]):
+        results = [run for (_, run) in (next(runs) for _ in group) if run is not None]
+        yield instance_id, results
+
+
 def get_instances_ids_from_results_dir(rootdir: str, instances_filter=lambda x: True):
+    if results_store.is_store(rootdir):
+        with results_store.ResultsStore(rootdir) as store:
+            return [instance_id for instance_id in store.instance_ids() if instances_filter(str(instance_id))]
     root = pathlib.Path(rootdir)
     return sorted([int(instance_id) for instance_id in filter(instances_filter, os.listdir(root))])
 
 
 def get_instances_ids_from_results_dir_for_difficulty_level(rootdir: str, difficulty_level_name: str):
     try:
-        instances_filter = {
-            '01_easy': lambda x: 0 <= int(x) < 50,
-            '02_medium': lambda x: 50 <= int(x) < 100,
-            '03_advanced': lambda x: 100 <= int(x) < 150,
-            '04_hard': lambda x: 150 <= int(x) < 200,
-        }[difficulty_level_name]
+        instances_filter = DIFFICULTY_LEVEL_FILTERS[difficulty_level_name]
         return get_instances_ids_from_results_dir(rootdir, instances_filter=instances_filter)
     except KeyError:
         raise ValueError("unknown difficulty level")
 
 
 def get_instances_results(rootdir: str, instances_filter=lambda x: True):
+    """
+    :param rootdir: directory with jsonpickle file per run or results store file
+    """
+    if results_store.is_store(rootdir):
+        with results_store.ResultsStore(rootdir) as store:
+            return store.get_instances_results(instances_filter)
     root = pathlib.Path(rootdir)
     results = {}
     for instance_id in filter(instances_filter, os.listdir(root)):
@@ -56,49 +133,312 @@ def get_instances_results(rootdir: str, instances_filter=lambda x: True):
 
 def get_results_for_difficulty_level(rootdir: str, difficulty_level_name: str):
     try:
-        instances_filter = {
-            '01_easy': lambda x: 0 <= int(x) < 50,
-            '02_medium': lambda x: 50 <= int(x) < 100,
-            '03_advanced': lambda x: 100 <= int(x) < 150,
-            '04_hard': lambda x: 150 <= int(x) < 200,
-        }[difficulty_level_name]
+        instances_filter = DIFFICULTY_LEVEL_FILTERS[difficulty_level_name]
         return get_instances_results(rootdir, instances_filter=instances_filter)
     except KeyError:
         raise ValueError("unknown difficulty level")
 
 
-def check_if_solved_correctly(solutions: list):
-    return [validate_sudoku(solution) for solution in solutions]
-
-
-def average_or_none(data: list):
-    return None if len(data) == 0 else sum(data) / len(data)
-
-
-def std_or_none(data: list):
-    return None if len(data) < 2 else statistics.stdev(data)
-
-
-def max_or_none(data: list):
-    return None if len(data) == 0 else max(data)
-
-
-def min_or_none(data: list):
-    return None if len(data) == 0 else min(data)
+def compress_result(result: dict) -> dict:
+    """
+    :return: result with partial times and scores replaced by compressed trace (points in which score changed),
+    in format written by SolutionTracer(compress=True)
+    """
+    if 'Trace' in result:
+        trace = result['Trace']
+        points = {key: np.asarray(trace[key], dtype=dtype)
+                  for key, dtype in [('times', np.float64), ('generations', np.int32), ('scores', np.int32)]}
+        generations = result['Generations']
+    else:
+        times, scores = partial_trace(result)
+        changes = np.flatnonzero(np.diff(scores)) + 1
+        kept = np.concatenate([[0], changes, [len(scores) - 1]]) if len(scores) > 0 else changes
+        points = {
+            'times': times[kept].astype(np.float64),
+            'generations': kept.astype(np.int32),
+            'scores': scores[kept].astype(np.int32),
+        }
+        generations = len(scores)
+    compressed = {key: value for key, value in result.items() if key not in ('Partial times', 'Partial scores')}
+    compressed['Solution'] = np.asarray(result['Solution'], dtype=np.uint8)
+    compressed['Trace'] = points
+    compressed['Generations'] = generations
+    return compressed
+
+
+class ResultsIndex:
+    """
+    Parsed results of a directory with one jsonpickle file per run, keyed by path of the file and its mtime.
+    Index is kept in a pickle file next to the directory, so every file is parsed once and refreshing after
+    new experiments parses only new or modified files. Runs are kept compressed (see compress_result),
+    runs which ended without solution are skipped.
+    For results store files, runs are read from the store once per refresh.
+    """
+    VERSION = 1
+
+    def __init__(self, rootdir: str, cache_path: str = None, processes: int = None):
+        self.rootdir: str = rootdir
+        self.processes: int = processes
+        self.cache_path: str = cache_path or '{}.index.pickle'.format(str(rootdir).rstrip('/'))
+        self.entries: dict = {}  # relative path -> (mtime, size, compressed run or None)
+        self._store_results = None
+        if not results_store.is_store(rootdir) and os.path.isfile(self.cache_path):
+            with open(self.cache_path, 'rb') as f:
+                version, entries = pickle.load(f)
+            if version == self.VERSION:
+                self.entries = entries
+
+    def refresh(self) -> int:
+        """
+        :return: amount of parsed files
+        """
+        if results_store.is_store(self.rootdir):
+            with results_store.ResultsStore(self.rootdir) as store:
+                self._store_results = {instance_id: [compress_result(result) for result in results]
+                                       for instance_id, results in store.get_instances_results().items()}
+            return sum(len(results) for results in self._store_results.values())
+
+        root = pathlib.Path(self.rootdir)
+        seen = set()
+        pending = {}  # path -> (key, stat)
+        for instance_dir in os.scandir(root):
+            if not instance_dir.is_dir():
+                continue
+            for file in os.scandir(instance_dir.path):
+                key = '{}/{}'.format(instance_dir.name, file.name)
+                stat = file.stat()
+                seen.add(key)
+                entry = self.entries.get(key)
+                if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                    pending[file.path] = (key, stat)
+
+        for path, run in load_results(list(pending), self.processes):
+            key, stat = pending[path]
+            self.entries[key] = (stat.st_mtime_ns, stat.st_size, run)
+        parsed = len(pending)
+
+        removed = self.entries.keys() - seen
+        for key in removed:
+            del self.entries[key]
+        if parsed > 0 or len(removed) > 0:
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump((self.VERSION, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        return parsed
+
+    def results(self, instances_filter=lambda x: True) -> dict:
+        """
+        :return: {instance id: [results]}, like get_instances_results
+        """
+        if self._store_results is not None:
+            return {instance_id: results for instance_id, results in self._store_results.items()
+                    if instances_filter(instance_id)}
+        results = {}
+        for key in sorted(self.entries):
+            instance_id = key.split('/')[0]
+            run = self.entries[key][2]
+            if instances_filter(instance_id):
+                results.setdefault(instance_id, [])
+                if run is not None:
+                    results[instance_id].append(run)
+        return results
+
+    def results_for_difficulty_level(self, difficulty_level_name: str) -> dict:
+        try:
+            return self.results(DIFFICULTY_LEVEL_FILTERS[difficulty_level_name])
+        except KeyError:
+            raise ValueError("unknown difficulty level")
+
+
+def number_of_generations(result: dict) -> int:
+    return result['Generations'] if 'Generations' in result else len(result['Partial scores'])
+
+
+def final_time(result: dict) -> float:
+    times = result['Trace']['times'] if 'Trace' in result else result['Partial times']
+    return float(times[-1])
+
+
+def partial_trace(result: dict) -> (np.ndarray, np.ndarray):
+    """
+    :return: time and score of every generation, compressed trace is expanded into step curve
+    with times of generations between its points interpolated
+    """
+    if 'Trace' not in result:
+        scores = np.asarray(result['Partial scores'])
+        return np.asarray(result['Partial times'], dtype=float), scores.reshape(len(scores), -1)[:, 0]
+    trace = result['Trace']
+    generations = np.asarray(trace['generations'])
+    scores = np.repeat(trace['scores'], np.diff(np.append(generations, result['Generations'])))
+    times = np.interp(np.arange(result['Generations']), generations, trace['times'])
+    return times, scores
+
+
+def step_trace(result: dict) -> (np.ndarray, np.ndarray):
+    """
+    :return: times and scores of points where step curve of the run changes, compressed trace is not expanded
+    """
+    if 'Trace' not in result:
+        return partial_trace(result)
+    return np.asarray(result['Trace']['times'], dtype=float), np.asarray(result['Trace']['scores'])
+
+
+def time_grid(traces, points: int = 200) -> np.ndarray:
+    """
+    :param traces: iterable of (times, scores) pairs
+    :return: log-spaced times from the earliest positive to the latest time of traces, empty if there is none
+    """
+    first, last = np.inf, 0.0
+    for times, _ in traces:
+        times = np.asarray(times, dtype=float)
+        positive = times[times > 0]
+        if len(positive) > 0:
+            first = min(first, positive[0])
+            last = max(last, positive[-1])
+    if last == 0:
+        return np.zeros(0)
+    return np.geomspace(first, last, points) if last > first else np.array([last])
+
+
+def resample_traces(traces: list, grid: np.ndarray) -> np.ndarray:
+    """
+    Resamples step curves of all traces at once, value at grid time t is the score of the last point
+    of trace at or before t, the first score before the trace starts; empty traces are skipped
+    :param traces: list of (times, scores) pairs, times ascending
+    :return: array of shape (traces, grid points)
+    """
+    traces = [(np.asarray(times, dtype=float), np.asarray(scores)) for times, scores in traces if len(times) > 0]
+    n_points = len(grid) + 1
+    if len(traces) == 0:
+        return np.zeros((0, len(grid)))
+    lengths = np.array([len(times) for times, _ in traces])
+    times = np.concatenate([times for times, _ in traces])
+    scores = np.concatenate([scores for _, scores in traces])
+    runs = np.repeat(np.arange(len(traces)), lengths)
+    # every point is the latest one of its run from the first grid time not earlier than it
+    positions = np.searchsorted(grid, times, side='left')
+    counts = np.bincount(runs * n_points + positions, minlength=len(traces) * n_points)
+    counts = counts.reshape(len(traces), n_points)[:, :-1].cumsum(axis=1)
+    starts = np.cumsum(lengths) - lengths
+    return scores[starts[:, None] + np.maximum(counts - 1, 0)]
+
+
+class TraceBands:
+    """
+    Streaming statistics of step curves of traces on a shared time grid. Traces are resampled in chunks
+    and folded into running sum, min, max and histogram of integer scores of every grid time, so memory
+    depends on size of grid and range of scores, not on amount of traces.
+    """
+
+    def __init__(self, grid: np.ndarray, chunk_size: int = 256):
+        self.grid: np.ndarray = np.asarray(grid, dtype=float)
+        self.chunk_size: int = chunk_size
+        self.count: int = 0
+        self.sum = np.zeros(len(self.grid))
+        self.min = np.full(len(self.grid), np.inf)
+        self.max = np.full(len(self.grid), -np.inf)
+        self.histogram = np.zeros((0, len(self.grid)), dtype=np.int64)  # [score, grid time]
+        self._pending = []
+
+    def add(self, times, scores) -> None:
+        if len(times) == 0:
+            return
+        self._pending.append((times, scores))
+        self.count += 1
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def add_many(self, traces) -> 'TraceBands':
+        """
+        :param traces: iterable of (times, scores) pairs
+        """
+        for times, scores in traces:
+            self.add(times, scores)
+        return self
+
+    def _flush(self) -> None:
+        if len(self._pending) == 0:
+            return
+        curves = np.rint(resample_traces(self._pending, self.grid)).astype(np.int64)
+        self._pending = []
+        self.sum += curves.sum(axis=0)
+        np.minimum(self.min, curves.min(axis=0), out=self.min)
+        np.maximum(self.max, curves.max(axis=0), out=self.max)
+
+        n_points = len(self.grid)
+        n_scores = max(len(self.histogram), int(curves.max()) + 1)
+        if n_scores > len(self.histogram):
+            self.histogram = np.pad(self.histogram, ((0, n_scores - len(self.histogram)), (0, 0)))
+        cells = curves * n_points + np.arange(n_points)
+        self.histogram += np.bincount(cells.ravel(), minlength=n_scores * n_points).reshape(n_scores, n_points)
+
+    def mean(self) -> np.ndarray:
+        self._flush()
+        return self.sum / self.count if self.count > 0 else np.full(len(self.grid), np.nan)
+
+    def minimum(self) -> np.ndarray:
+        self._flush()
+        return self.min if self.count > 0 else np.full(len(self.grid), np.nan)
+
+    def maximum(self) -> np.ndarray:
+        self._flush()
+        return self.max if self.count > 0 else np.full(len(self.grid), np.nan)
+
+    def percentile(self, q: float) -> np.ndarray:
+        """
+        :param q: percentile in [0, 100], nearest-rank method
+        """
+        self._flush()
+        if self.count == 0:
+            return np.full(len(self.grid), np.nan)
+        rank = min(max(int(np.ceil(q / 100 * self.count)), 1), self.count)
+        return np.argmax(self.histogram.cumsum(axis=0) >= rank, axis=0).astype(float)
+
+
+_BAND_METHODS = {
+    np.mean: TraceBands.mean,
+    np.max: TraceBands.maximum,
+    np.min: TraceBands.minimum,
+}
+
+
+def reduce_traces(traces: list, grid: np.ndarray, method) -> np.ndarray:
+    """
+    :param method: np.mean, np.max, np.min or percentile (e.g. 90) computed with TraceBands,
+    any other reduction with axis argument gets resampled traces of shape (traces, grid points)
+    """
+    if method in _BAND_METHODS:
+        return _BAND_METHODS[method](TraceBands(grid).add_many(traces))
+    if isinstance(method, (int, float)):
+        return TraceBands(grid).add_many(traces).percentile(method)
+    return method(resample_traces(traces, grid), axis=0)
+
+
+def _figure():
+    """
+    :return: figure drawn with Agg canvas, matplotlib is imported on first plot only, so analysis
+    can be imported without it and plots are rendered without global pyplot state
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    return figure
 
 
 def make_boxplot(title: str,
                  data: list,
                  xlabels: list, xlabel: str, ylabel: str, ylims: tuple,
                  output_filename: str):
-    plt.clf()
-    plt.boxplot(data)
-    plt.title(title)
-    plt.xticks(list(range(1, len(xlabels) + 1)), xlabels)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.ylim(ylims)
-    plt.savefig(output_filename)
+    figure = _figure()
+    axes = figure.add_subplot()
+    axes.boxplot(data)
+    axes.set_title(title)
+    axes.set_xticks(list(range(1, len(xlabels) + 1)), xlabels)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    axes.set_ylim(ylims)
+    figure.savefig(output_filename)
 
 
 def make_lineplot(title: str,
@@ -107,139 +447,224 @@ def make_lineplot(title: str,
                   xlabel: str, ylabel: str,
                   xlims: tuple, ylims: tuple,
                   method,
-                  output_filename: str):
-    plt.clf()
+                  output_filename: str,
+                  grid_points: int = 200):
+    """
+    Step curves of runs are resampled onto log-spaced time grid shared by all groups, one line per group
+    :param xdata_groups: groups of arrays of partial times of every run
+    :param ydata_groups: groups of arrays of partial scores of every run, see partial_trace and step_trace
+    :param method: reduction of runs of a group, see reduce_traces
+    """
+    figure = _figure()
+    axes = figure.add_subplot()
+
+    groups = [list(zip(x_points_group, y_points_group))
+              for x_points_group, y_points_group in zip(xdata_groups, ydata_groups)]
+    grid = time_grid(itertools.chain.from_iterable(groups), grid_points)
+    for traces in groups:
+        if len(grid) > 0 and any(len(times) > 0 for times, _ in traces):
+            axes.plot(grid, reduce_traces(traces, grid, method))
+
+    axes.set_title(title)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    if xlims is not None:
+        axes.set_xlim(xlims)
+    if ylims is not None:
+        axes.set_ylim(ylims)
+    axes.set_xscale('log')
+    figure.savefig(output_filename)
 
-    for x_points_group, y_points_group in zip(xdata_groups, ydata_groups):
-        xs = list(np.array(one_xs) for one_xs in x_points_group)
-        ys = list(np.array([score[0] for score in one_ys]) for one_ys in y_points_group)
 
-        try:
-            mean_x_axis = [i for i in range(max(len(_xs) for _xs in xs))]
-            ys_interp = [np.interp(mean_x_axis, xs[i], ys[i]) for i in range(len(xs))]
-            mean_y_axis = method(ys_interp, axis=0)
-            plt.plot(mean_x_axis, mean_y_axis)
-        except ValueError:
-            pass  # xs is empty
-
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    if xlims is not None:
-        plt.xlim(xlims)
+def make_bandplot(title: str,
+                  traces: list,
+                  xlabel: str, ylabel: str,
+                  ylims: tuple,
+                  output_filename: str,
+                  percentiles: tuple = (50, 90, 99),
+                  grid_points: int = 200):
+    """
+    Percentiles of step curves of all runs, computed in a streaming way with TraceBands
+    :param traces: list of (times, scores) pairs
+    """
+    figure = _figure()
+    axes = figure.add_subplot()
+
+    traces = list(traces)
+    grid = time_grid(traces, grid_points)
+    if len(grid) > 0:
+        bands = TraceBands(grid).add_many(traces)
+        for q in percentiles:
+            axes.plot(grid, bands.percentile(q), label=f'p{q}')
+        axes.legend()
+
+    axes.set_title(title)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
     if ylims is not None:
-        plt.ylim(ylims)
-    plt.xscale('log')
-    plt.savefig(output_filename)
+        axes.set_ylim(ylims)
+    axes.set_xscale('log')
+    figure.savefig(output_filename)
+
+
+PLOT_FUNCTIONS = {
+    'boxplot': make_boxplot,
+    'lineplot': make_lineplot,
+    'bandplot': make_bandplot,
+}
+
+
+@dataclass
+class PlotJob:
+    kind: str  # key of PLOT_FUNCTIONS
+    args: tuple  # positional arguments of plot function
+
+
+def _render(job: PlotJob) -> None:
+    PLOT_FUNCTIONS[job.kind](*job.args)
+
+
+def render_plots(jobs: list, processes: int = None) -> None:
+    """
+    Renders every plot in its own figure, in worker processes if there is more than one job
+    """
+    if len(jobs) < 2 or processes == 1:
+        for job in jobs:
+            _render(job)
+        return
+    with Pool(processes) as pool:
+        pool.map(_render, jobs, chunksize=1)
+
+
+def solved_mask(solutions: list) -> np.ndarray:
+    """
+    Solutions of the same size are validated in one pass with validate_population
+    :return: boolean array, True for correctly solved sudokus
+    """
+    if len(solutions) == 0:
+        return np.zeros(0, dtype=bool)
+    try:
+        return validate_population(np.array(solutions)) == 0
+    except ValueError:
+        pass  # sudokus of different sizes
+    solved = np.zeros(len(solutions), dtype=bool)
+    by_size = {}
+    for index, solution in enumerate(solutions):
+        by_size.setdefault(np.shape(solution), []).append(index)
+    for indexes in by_size.values():
+        solved[indexes] = validate_population(np.array([solutions[index] for index in indexes])) == 0
+    return solved
+
+
+def _grouped_statistics(values: np.ndarray, groups: np.ndarray, n_groups: int) -> dict:
+    """
+    :return: count, mean, sample std (ddof=1), min and max of values of every group as arrays
+    """
+    count = np.bincount(groups, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(groups, weights=values, minlength=n_groups) / count
+        deviations = values - mean[groups]
+        std = np.sqrt(np.bincount(groups, weights=deviations * deviations, minlength=n_groups) / (count - 1))
+    minimum = np.full(n_groups, np.inf)
+    maximum = np.full(n_groups, -np.inf)
+    np.minimum.at(minimum, groups, values)
+    np.maximum.at(maximum, groups, values)
+    return {'count': count, 'mean': mean, 'std': std, 'min': minimum, 'max': maximum}
+
+
+def _statistics_report(times: dict, generations: dict, group: int) -> dict:
+    count = int(times['count'][group])
+    return {
+        'time_average': None if count == 0 else float(times['mean'][group]),
+        'time_std': None if count < 2 else float(times['std'][group]),
+        'time_min': None if count == 0 else float(times['min'][group]),
+        'time_max': None if count == 0 else float(times['max'][group]),
+        'number_of_generations_average': None if count == 0 else float(generations['mean'][group]),
+        'number_of_generations_std': None if count < 2 else float(generations['std'][group]),
+        'number_of_generations_min': None if count == 0 else int(generations['min'][group]),
+        'number_of_generations_max': None if count == 0 else int(generations['max'][group]),
+    }
 
 
-def calculate_statistics(difficulty_results: dict, attach_all=False):
+def calculate_statistics(difficulty_results, attach_all=False):
+    """
+    All runs are gathered into arrays, solutions are validated in one vectorized pass and statistics
+    of all instances are computed at once
+    :param difficulty_results: {instance id: [results]} or iterable of (instance id, [results]) pairs,
+    e.g. iter_instances_results
+    """
+    if isinstance(difficulty_results, dict):
+        difficulty_results = difficulty_results.items()
+    instance_ids, solutions, times, generations, groups = [], [], [], [], []
+    for instance_id, instance_results in difficulty_results:
+        for one_result in instance_results:
+            solutions.append(one_result['Solution'])
+            times.append(final_time(one_result))
+            generations.append(number_of_generations(one_result))
+            groups.append(len(instance_ids))
+        instance_ids.append(instance_id)
+
+    n_instances = len(instance_ids)
+    groups = np.array(groups, dtype=np.intp)
+    times = np.array(times, dtype=np.float64)
+    generations = np.array(generations, dtype=np.int64)
+    solved = solved_mask(solutions)
+
+    # group n_instances holds all attempts of all instances
+    every_group = np.concatenate([groups, np.full(len(groups), n_instances)])
+    all_times = _grouped_statistics(np.tile(times, 2), every_group, n_instances + 1)
+    all_generations = _grouped_statistics(np.tile(generations, 2).astype(np.float64), every_group, n_instances + 1)
+    solved_groups = np.concatenate([groups[solved], np.full(np.count_nonzero(solved), n_instances)])
+    solved_times = _grouped_statistics(np.tile(times[solved], 2), solved_groups, n_instances + 1)
+    solved_generations = _grouped_statistics(np.tile(generations[solved], 2).astype(np.float64), solved_groups,
+                                             n_instances + 1)
+
+    bounds = np.concatenate([[0], np.cumsum(all_times['count'][:n_instances])])
     instance_stats = {}
-    all_times = []
-    all_times_correctly_solved = []
-    n_all_attempts_correctly_solved = 0
-    n_all_attempts = 0
-    all_numbers_of_generations = []
-    all_numbers_of_generations_correctly_solved = []
-    for instance_id, instance_results in difficulty_results.items():
-        # solved percentage
-        solutions = [one_result['Solution'] for one_result in instance_results]
-        list_of_correctly_solved = check_if_solved_correctly(solutions)
-        n_correctly_solved = sum(list_of_correctly_solved)
-        correctly_solved_percentage = n_correctly_solved / len(solutions) * 100
-
-        n_all_attempts_correctly_solved += n_correctly_solved
-        n_all_attempts += len(solutions)
-
-        # average time
-        times = [one_result['Partial times'][-1] for one_result in instance_results]
-        all_times.extend(times)
-
-        times_correctly_solved = list(itertools.compress(times, list_of_correctly_solved))
-        all_times_correctly_solved.extend(times_correctly_solved)
-
-        # number of generations for all attempts of current instance
-        numbers_of_generations = [len(one_result['Partial scores']) for one_result in instance_results]
-        numbers_of_generations_for_correctly_solved = list(
-            itertools.compress(numbers_of_generations, list_of_correctly_solved))
-
-        all_numbers_of_generations.extend(numbers_of_generations)
-        all_numbers_of_generations_correctly_solved.extend(numbers_of_generations_for_correctly_solved)
-
-        # report for current instance
+    for group, instance_id in enumerate(instance_ids):
+        n_attempts = int(all_times['count'][group])
+        n_correctly_solved = int(solved_times['count'][group])
         instance_stats[int(instance_id)] = {
-            'number_of_attempts': len(solutions),
+            'number_of_attempts': n_attempts,
             'number_of_attempts_solved': n_correctly_solved,
-            'correctly_solved_attempts_percentage': correctly_solved_percentage,
+            'correctly_solved_attempts_percentage': n_correctly_solved / n_attempts * 100,
 
             'statistics': {
-                'for_all_attempts': {
-                    'time_average': average_or_none(times),
-                    'time_std': std_or_none(times),
-                    'time_min': min_or_none(times),
-                    'time_max': max_or_none(times),
-                    'number_of_generations_average': average_or_none(numbers_of_generations),
-                    'number_of_generations_std': std_or_none(numbers_of_generations),
-                    'number_of_generations_min': min_or_none(numbers_of_generations),
-                    'number_of_generations_max': max_or_none(numbers_of_generations),
-                },
-                'for_correctly_solved_attempts': {
-                    'time_average': average_or_none(times_correctly_solved),
-                    'time_std': std_or_none(times_correctly_solved),
-                    'time_min': min_or_none(times_correctly_solved),
-                    'time_max': max_or_none(times_correctly_solved),
-                    'number_of_generations_average': average_or_none(numbers_of_generations_for_correctly_solved),
-                    'number_of_generations_std': std_or_none(numbers_of_generations_for_correctly_solved),
-                    'number_of_generations_min': min_or_none(numbers_of_generations_for_correctly_solved),
-                    'number_of_generations_max': max_or_none(numbers_of_generations_for_correctly_solved),
-                }
+                'for_all_attempts': _statistics_report(all_times, all_generations, group),
+                'for_correctly_solved_attempts': _statistics_report(solved_times, solved_generations, group),
             }
-
         }
 
         if attach_all:
+            # runs of every instance are contiguous
+            begin, end = bounds[group], bounds[group + 1]
+            group_solved = solved[begin:end]
             statistics = instance_stats[int(instance_id)]['statistics']
-            statistics['for_all_attempts']['number_of_generations_raw_data'] = numbers_of_generations
+            statistics['for_all_attempts']['number_of_generations_raw_data'] = generations[begin:end].tolist()
             statistics['for_correctly_solved_attempts'][
-                'number_of_generations_raw_data'] = numbers_of_generations_for_correctly_solved
-            statistics['for_all_attempts']['time_raw_data'] = times
-            statistics['for_correctly_solved_attempts']['time_raw_data'] = times_correctly_solved
+                'number_of_generations_raw_data'] = generations[begin:end][group_solved].tolist()
+            statistics['for_all_attempts']['time_raw_data'] = times[begin:end].tolist()
+            statistics['for_correctly_solved_attempts']['time_raw_data'] = times[begin:end][group_solved].tolist()
 
+    n_all_attempts = len(times)
+    n_all_attempts_correctly_solved = int(np.count_nonzero(solved))
     overall_stats = {
         'number_of_attempts': n_all_attempts,
         'number_of_attempts_solved': n_all_attempts_correctly_solved,
         'correctly_solved_attempts_percent': None if n_all_attempts == 0 else n_all_attempts_correctly_solved / n_all_attempts * 100,
         'statistics': {
-            'for_all_attempts': {
-                'time_average': average_or_none(all_times),
-                'time_std': std_or_none(all_times),
-                'time_min': min_or_none(all_times),
-                'time_max': max_or_none(all_times),
-                'number_of_generations_average': average_or_none(all_numbers_of_generations),
-                'number_of_generations_std': std_or_none(all_numbers_of_generations),
-                'number_of_generations_min': min_or_none(all_numbers_of_generations),
-                'number_of_generations_max': max_or_none(all_numbers_of_generations),
-            },
-            'for_correctly_solved_attempts': {
-                'time_average': average_or_none(all_times_correctly_solved),
-                'time_std': std_or_none(all_times_correctly_solved),
-                'time_min': min_or_none(all_times_correctly_solved),
-                'time_max': max_or_none(all_times_correctly_solved),
-                'number_of_generations_average': average_or_none(all_numbers_of_generations_correctly_solved),
-                'number_of_generations_std': std_or_none(all_numbers_of_generations_correctly_solved),
-                'number_of_generations_min': min_or_none(all_numbers_of_generations_correctly_solved),
-                'number_of_generations_max': max_or_none(all_numbers_of_generations_correctly_solved),
-            }
+            'for_all_attempts': _statistics_report(all_times, all_generations, n_instances),
+            'for_correctly_solved_attempts': _statistics_report(solved_times, solved_generations, n_instances),
         }
     }
 
     if attach_all:
         statistics = overall_stats['statistics']
-        statistics['for_all_attempts']['number_of_generations_raw_data'] = all_numbers_of_generations
+        statistics['for_all_attempts']['number_of_generations_raw_data'] = generations.tolist()
         statistics['for_correctly_solved_attempts'][
-            'number_of_generations_raw_data'] = all_numbers_of_generations_correctly_solved
-        statistics['for_all_attempts']['time_raw_data'] = all_times
-        statistics['for_correctly_solved_attempts']['time_raw_data'] = all_times_correctly_solved
+            'number_of_generations_raw_data'] = generations[solved].tolist()
+        statistics['for_all_attempts']['time_raw_data'] = times.tolist()
+        statistics['for_correctly_solved_attempts']['time_raw_data'] = times[solved].tolist()
 
     return {
         'overall_stats': overall_stats,
@@ -248,46 +673,29 @@ def calculate_statistics(difficulty_results: dict, attach_all=False):
 
 
 if __name__ == '__main__':
-    difficulty_levels_names = level_1, level_2, level_3, level_4 = ['01_easy', '02_medium', '03_advanced', '04_hard']
-    report, report_big = None, None
+    difficulty_levels_names = ['01_easy', '02_medium', '03_advanced', '04_hard']
+    results_path = 'output/results.sqlite' if results_store.is_store('output/results.sqlite') else 'output/results'
 
-    # load or generate big report
-    try:
-        with open('report_big.json') as report_big_file:
-            report_big = json.load(report_big_file)
-    except FileNotFoundError:
-        report_big = {
-            level_1:
-                calculate_statistics(get_results_for_difficulty_level('output/results', '01_easy'), attach_all=True),
-            level_2:
-                calculate_statistics(get_results_for_difficulty_level('output/results', '02_medium'), attach_all=True),
-            level_3:
-                calculate_statistics(get_results_for_difficulty_level('output/results', '03_advanced'),
-                                     attach_all=True),
-            level_4:
-                calculate_statistics(get_results_for_difficulty_level('output/results', '04_hard'), attach_all=True),
-        }
-        with open('report_big.json', 'w') as report_big_file:
-            json.dump(report_big, report_big_file)
+    # every result file is parsed once, later runs parse only new files
+    index = ResultsIndex(results_path)
+    print('{} result files parsed'.format(index.refresh()))
+    level_results = {level: index.results_for_difficulty_level(level) for level in difficulty_levels_names}
 
-    # generate nice report file if not exists already
-    try:
-        with open('report.yaml') as report_file:
-            report = yaml.safe_load(report_file)
-    except FileNotFoundError:
-        report = {
-            level_1: calculate_statistics(get_results_for_difficulty_level('output/results', '01_easy')),
-            level_2: calculate_statistics(get_results_for_difficulty_level('output/results', '02_medium')),
-            level_3: calculate_statistics(get_results_for_difficulty_level('output/results', '03_advanced')),
-            level_4: calculate_statistics(get_results_for_difficulty_level('output/results', '04_hard'))
-        }
-        with open('report.yaml', 'w') as report_file:
-            yaml.dump(report, report_file)
+    report_big = {level: calculate_statistics(level_results[level], attach_all=True)
+                  for level in difficulty_levels_names}
+    with open('report_big.json', 'w') as report_big_file:
+        json.dump(report_big, report_big_file)
+
+    report = {level: calculate_statistics(level_results[level]) for level in difficulty_levels_names}
+    with open('report.yaml', 'w') as report_file:
+        yaml.dump(report, report_file)
 
     #
     # BOXPLOTS
     #
 
+    jobs = []
+
     TIME_LABEL = 'czas [sekundy]'
     SCORE_LABEL = 'wartość funkcji celu'
     INSTANCE_LABEL = 'ID instancji'
@@ -299,101 +707,109 @@ if __name__ == '__main__':
     SCORE_YLIMS = (-1, 25)
 
     # per difficulty level: number of generations (all attempts)
-    make_boxplot('Liczba pokoleń (wszystkie próby)',
-                 [level_stats['overall_stats']['statistics']['for_all_attempts']['number_of_generations_raw_data']
-                  for level_stats in [report_big[level] for level in difficulty_levels_names]],
-                 difficulty_levels_names,
-                 DIFFICULTY_LABEL,
-                 GENERATIONS_LABEL,
-                 GENERATIONS_YLIMS,
-                 'output/plots/n_generations_all.png')
+    jobs.append(PlotJob('boxplot', (
+        'Liczba pokoleń (wszystkie próby)',
+        [level_stats['overall_stats']['statistics']['for_all_attempts']['number_of_generations_raw_data']
+         for level_stats in [report_big[level] for level in difficulty_levels_names]],
+        difficulty_levels_names,
+        DIFFICULTY_LABEL,
+        GENERATIONS_LABEL,
+        GENERATIONS_YLIMS,
+        'output/plots/n_generations_all.png')))
 
     # per difficulty level: number of generations (correct only)
-    make_boxplot('Liczba pokoleń (tylko rozwiązane)',
-                 [level_stats['overall_stats']['statistics']['for_correctly_solved_attempts'][
-                      'number_of_generations_raw_data']
-                  for level_stats in [report_big[level] for level in difficulty_levels_names]],
-                 difficulty_levels_names,
-                 DIFFICULTY_LABEL,
-                 GENERATIONS_LABEL,
-                 GENERATIONS_YLIMS,
-                 'output/plots/n_generations_correct.png')
+    jobs.append(PlotJob('boxplot', (
+        'Liczba pokoleń (tylko rozwiązane)',
+        [level_stats['overall_stats']['statistics']['for_correctly_solved_attempts'][
+             'number_of_generations_raw_data']
+         for level_stats in [report_big[level] for level in difficulty_levels_names]],
+        difficulty_levels_names,
+        DIFFICULTY_LABEL,
+        GENERATIONS_LABEL,
+        GENERATIONS_YLIMS,
+        'output/plots/n_generations_correct.png')))
 
     # per instance: number of generations (all attempts)
     for level_name in difficulty_levels_names:
         data = [pair for pair in report_big[level_name]['per_instance_stats'].items()]
         data.sort(key=lambda x: int(x[0]))
 
-        make_boxplot(f'Liczba pokoleń (wszystkie próby) - poziom {level_name}',
-                     [instance_data[1]['statistics']['for_all_attempts']['number_of_generations_raw_data'] for
-                      instance_data in data],
-                     [instance_data[0] for instance_data in data],
-                     INSTANCE_LABEL,
-                     GENERATIONS_LABEL,
-                     GENERATIONS_YLIMS,
-                     f'output/plots/n_generations_all_{level_name}.png')
+        jobs.append(PlotJob('boxplot', (
+            f'Liczba pokoleń (wszystkie próby) - poziom {level_name}',
+            [instance_data[1]['statistics']['for_all_attempts']['number_of_generations_raw_data'] for
+             instance_data in data],
+            [instance_data[0] for instance_data in data],
+            INSTANCE_LABEL,
+            GENERATIONS_LABEL,
+            GENERATIONS_YLIMS,
+            f'output/plots/n_generations_all_{level_name}.png')))
 
     # per instance: number of generations (correct only)
     for level_name in difficulty_levels_names:
         data = [pair for pair in report_big[level_name]['per_instance_stats'].items()]
         data.sort(key=lambda x: int(x[0]))
 
-        make_boxplot(f'Liczba pokoleń (tylko rozwiązane) - poziom {level_name}',
-                     [instance_data[1]['statistics']['for_correctly_solved_attempts']['number_of_generations_raw_data']
-                      for instance_data in data],
-                     [instance_data[0] for instance_data in data],
-                     INSTANCE_LABEL,
-                     GENERATIONS_LABEL,
-                     GENERATIONS_YLIMS,
-                     f'output/plots/n_generations_correct_{level_name}.png')
+        jobs.append(PlotJob('boxplot', (
+            f'Liczba pokoleń (tylko rozwiązane) - poziom {level_name}',
+            [instance_data[1]['statistics']['for_correctly_solved_attempts']['number_of_generations_raw_data']
+             for instance_data in data],
+            [instance_data[0] for instance_data in data],
+            INSTANCE_LABEL,
+            GENERATIONS_LABEL,
+            GENERATIONS_YLIMS,
+            f'output/plots/n_generations_correct_{level_name}.png')))
 
     # per difficulty level: time (all attempts)
-    make_boxplot('Czas (wszystkie próby)',
-                 [level_stats['overall_stats']['statistics']['for_all_attempts']['time_raw_data']
-                  for level_stats in [report_big[level] for level in difficulty_levels_names]],
-                 difficulty_levels_names,
-                 DIFFICULTY_LABEL,
-                 TIME_LABEL,
-                 TIME_YLIMS,
-                 'output/plots/time_all.png')
+    jobs.append(PlotJob('boxplot', (
+        'Czas (wszystkie próby)',
+        [level_stats['overall_stats']['statistics']['for_all_attempts']['time_raw_data']
+         for level_stats in [report_big[level] for level in difficulty_levels_names]],
+        difficulty_levels_names,
+        DIFFICULTY_LABEL,
+        TIME_LABEL,
+        TIME_YLIMS,
+        'output/plots/time_all.png')))
 
     # per difficulty level: time (correct only)
-    make_boxplot('Czas (tylko rozwiązane)',
-                 [level_stats['overall_stats']['statistics']['for_correctly_solved_attempts']['time_raw_data']
-                  for level_stats in [report_big[level] for level in difficulty_levels_names]],
-                 difficulty_levels_names,
-                 DIFFICULTY_LABEL,
-                 TIME_LABEL,
-                 TIME_YLIMS,
-                 'output/plots/time_correct.png')
+    jobs.append(PlotJob('boxplot', (
+        'Czas (tylko rozwiązane)',
+        [level_stats['overall_stats']['statistics']['for_correctly_solved_attempts']['time_raw_data']
+         for level_stats in [report_big[level] for level in difficulty_levels_names]],
+        difficulty_levels_names,
+        DIFFICULTY_LABEL,
+        TIME_LABEL,
+        TIME_YLIMS,
+        'output/plots/time_correct.png')))
 
     # per instance: time (all attempts)
     for level_name in difficulty_levels_names:
         data = [pair for pair in report_big[level_name]['per_instance_stats'].items()]
         data.sort(key=lambda x: int(x[0]))
 
-        make_boxplot(f'Czas (wszystkie próby) - poziom {level_name}',
-                     [instance_data[1]['statistics']['for_all_attempts']['time_raw_data'] for
-                      instance_data in data],
-                     [instance_data[0] for instance_data in data],
-                     INSTANCE_LABEL,
-                     TIME_LABEL,
-                     TIME_YLIMS,
-                     f'output/plots/time_all_{level_name}.png')
+        jobs.append(PlotJob('boxplot', (
+            f'Czas (wszystkie próby) - poziom {level_name}',
+            [instance_data[1]['statistics']['for_all_attempts']['time_raw_data'] for
+             instance_data in data],
+            [instance_data[0] for instance_data in data],
+            INSTANCE_LABEL,
+            TIME_LABEL,
+            TIME_YLIMS,
+            f'output/plots/time_all_{level_name}.png')))
 
     # per instance: time (correct only)
     for level_name in difficulty_levels_names:
         data = [pair for pair in report_big[level_name]['per_instance_stats'].items()]
         data.sort(key=lambda x: int(x[0]))
 
-        make_boxplot(f'Czas (tylko rozwiązane) - poziom {level_name}',
-                     [instance_data[1]['statistics']['for_correctly_solved_attempts']['time_raw_data']
-                      for instance_data in data],
-                     [instance_data[0] for instance_data in data],
-                     INSTANCE_LABEL,
-                     TIME_LABEL,
-                     TIME_YLIMS,
-                     f'output/plots/time_correct_{level_name}.png')
+        jobs.append(PlotJob('boxplot', (
+            f'Czas (tylko rozwiązane) - poziom {level_name}',
+            [instance_data[1]['statistics']['for_correctly_solved_attempts']['time_raw_data']
+             for instance_data in data],
+            [instance_data[0] for instance_data in data],
+            INSTANCE_LABEL,
+            TIME_LABEL,
+            TIME_YLIMS,
+            f'output/plots/time_correct_{level_name}.png')))
 
     #
     # LINE PLOTS
@@ -403,78 +819,95 @@ if __name__ == '__main__':
     for level_name in difficulty_levels_names:
         xdata = []
         ydata = []
-        results = get_results_for_difficulty_level('output/results', level_name)
+        results = level_results[level_name]
         for instance_id, instance_results in results.items():
-            solutions = [one_result['Solution'] for one_result in instance_results]
-            list_of_correctly_solved = check_if_solved_correctly(solutions)
-
-            xdata.append([one_result['Partial times'] for one_result in instance_results])
-            ydata.append([one_result['Partial scores'] for one_result in instance_results])
-
-        make_lineplot(f'Uśrednione przebiegi czasowe (wszystkie próby) - poziom {level_name}',
-                      xdata,
-                      ydata,
-                      TIME_LABEL,
-                      SCORE_LABEL,
-                      None, SCORE_YLIMS,
-                      np.mean,
-                      f'output/plots/time_all_mean_scores_{level_name}.png')
-
-        make_lineplot(f'Maksymalne przebiegi czasowe (wszystkie próby) - poziom {level_name}',
-                      xdata,
-                      ydata,
-                      TIME_LABEL,
-                      SCORE_LABEL,
-                      None, SCORE_YLIMS,
-                      np.max,
-                      f'output/plots/time_all_max_scores_{level_name}.png')
-
-        make_lineplot(f'Minimalne przebiegi czasowe (wszystkie próby) - poziom {level_name}',
-                      xdata,
-                      ydata,
-                      TIME_LABEL,
-                      SCORE_LABEL,
-                      None, SCORE_YLIMS,
-                      np.min,
-                      f'output/plots/time_all_min_scores_{level_name}.png')
+            traces = [step_trace(one_result) for one_result in instance_results]
+            xdata.append([times for times, _ in traces])
+            ydata.append([scores for _, scores in traces])
+
+        jobs.append(PlotJob('lineplot', (
+            f'Uśrednione przebiegi czasowe (wszystkie próby) - poziom {level_name}',
+            xdata,
+            ydata,
+            TIME_LABEL,
+            SCORE_LABEL,
+            None, SCORE_YLIMS,
+            np.mean,
+            f'output/plots/time_all_mean_scores_{level_name}.png')))
+
+        jobs.append(PlotJob('lineplot', (
+            f'Maksymalne przebiegi czasowe (wszystkie próby) - poziom {level_name}',
+            xdata,
+            ydata,
+            TIME_LABEL,
+            SCORE_LABEL,
+            None, SCORE_YLIMS,
+            np.max,
+            f'output/plots/time_all_max_scores_{level_name}.png')))
+
+        jobs.append(PlotJob('lineplot', (
+            f'Minimalne przebiegi czasowe (wszystkie próby) - poziom {level_name}',
+            xdata,
+            ydata,
+            TIME_LABEL,
+            SCORE_LABEL,
+            None, SCORE_YLIMS,
+            np.min,
+            f'output/plots/time_all_min_scores_{level_name}.png')))
 
     # per instance: average time lines (correct only)
     for level_name in difficulty_levels_names:
         xdata = []
         ydata = []
-        results = get_results_for_difficulty_level('output/results', level_name)
+        results = level_results[level_name]
         for instance_id, instance_results in results.items():
             solutions = [one_result['Solution'] for one_result in instance_results]
-            list_of_correctly_solved = check_if_solved_correctly(solutions)
-
-            xdata.append(list(itertools.compress([one_result['Partial times'] for one_result in instance_results],
-                                                 list_of_correctly_solved)))
-            ydata.append(list(itertools.compress([one_result['Partial scores'] for one_result in instance_results],
-                                                 list_of_correctly_solved)))
-
-        make_lineplot(f'Uśrednione przebiegi czasowe (tylko rozwiązane) - poziom {level_name}',
-                      xdata,
-                      ydata,
-                      TIME_LABEL,
-                      SCORE_LABEL,
-                      None, SCORE_YLIMS,
-                      np.mean,
-                      f'output/plots/time_correct_mean_scores_{level_name}.png')
-
-        make_lineplot(f'Maksymalne przebiegi czasowe (tylko rozwiązane) - poziom {level_name}',
-                      xdata,
-                      ydata,
-                      TIME_LABEL,
-                      SCORE_LABEL,
-                      None, SCORE_YLIMS,
-                      np.max,
-                      f'output/plots/time_correct_max_scores_{level_name}.png')
-
-        make_lineplot(f'Minimalne przebiegi czasowe (tylko rozwiązane) - poziom {level_name}',
-                      xdata,
-                      ydata,
-                      TIME_LABEL,
-                      SCORE_LABEL,
-                      None, SCORE_YLIMS,
-                      np.min,
-                      f'output/plots/time_correct_min_scores_{level_name}.png')
+            list_of_correctly_solved = solved_mask(solutions)
+
+            traces = list(itertools.compress([step_trace(one_result) for one_result in instance_results],
+                                             list_of_correctly_solved))
+            xdata.append([times for times, _ in traces])
+            ydata.append([scores for _, scores in traces])
+
+        jobs.append(PlotJob('lineplot', (
+            f'Uśrednione przebiegi czasowe (tylko rozwiązane) - poziom {level_name}',
+            xdata,
+            ydata,
+            TIME_LABEL,
+            SCORE_LABEL,
+            None, SCORE_YLIMS,
+            np.mean,
+            f'output/plots/time_correct_mean_scores_{level_name}.png')))
+
+        jobs.append(PlotJob('lineplot', (
+            f'Maksymalne przebiegi czasowe (tylko rozwiązane) - poziom {level_name}',
+            xdata,
+            ydata,
+            TIME_LABEL,
+            SCORE_LABEL,
+            None, SCORE_YLIMS,
+            np.max,
+            f'output/plots/time_correct_max_scores_{level_name}.png')))
+
+        jobs.append(PlotJob('lineplot', (
+            f'Minimalne przebiegi czasowe (tylko rozwiązane) - poziom {level_name}',
+            xdata,
+            ydata,
+            TIME_LABEL,
+            SCORE_LABEL,
+            None, SCORE_YLIMS,
+            np.min,
+            f'output/plots/time_correct_min_scores_{level_name}.png')))
+
+    # per difficulty level: percentiles of step curves of all runs
+    for level_name in difficulty_levels_names:
+        jobs.append(PlotJob('bandplot', (
+            f'Percentyle przebiegów czasowych (wszystkie próby) - poziom {level_name}',
+            [step_trace(one_result) for instance_results in level_results[level_name].values()
+             for one_result in instance_results],
+            TIME_LABEL,
+            SCORE_LABEL,
+            SCORE_YLIMS,
+            f'output/plots/time_all_percentile_scores_{level_name}.png')))
+
+    render_plots(jobs)
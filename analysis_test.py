@@ -0,0 +1,160 @@
+import os
+import statistics
+import tempfile
+import unittest
+
+import jsonpickle
+import numpy as np
+
+import analysis
+from results_store import ResultsStore
+from evaluation import validate_chromosomes
+from evolutionary import algorithm, config
+from tools import SolutionTracer
+
+
+class AnalysisTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        toolbox = algorithm.create_toolbox(config.DefaultConfig)
+        self.population = toolbox.population(n=20)
+        for ind, fit in zip(self.population, validate_chromosomes(self.population)):
+            ind.fitness.values = fit
+
+    def test_tracer_writes_results_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.sqlite')
+            for run in range(2):
+                with SolutionTracer('run', id=7, clues=30, store=path) as tracer:
+                    for generation, ind in enumerate(sorted(self.population, key=lambda x: -x.fitness.values[0])):
+                        tracer.update(ind, 0.1 * generation)
+            results = analysis.get_instances_results(path)
+            self.assertEqual(list(results.keys()), ['7'])
+            self.assertEqual(len(results['7']), 2)
+            result = results['7'][0]
+            self.assertEqual(result['Partial scores'][:, 0].tolist(), [ind.fitness.values[0] for ind in
+                             sorted(self.population, key=lambda x: -x.fitness.values[0])])
+            self.assertTrue(np.array_equal(result['Solution'], tracer.best_sudoku))
+
+    def test_tracer_records_failed_run_in_results_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.sqlite')
+            with self.assertRaisesRegex(KeyError, 'engine failed'):
+                with SolutionTracer('run', id=5, clues=25, store=path):
+                    raise KeyError('engine failed')
+            with ResultsStore(path) as store:
+                rows = store.connection.execute(
+                    'SELECT instance_id, clues, finished_normally, exception_type, error, solution FROM runs').fetchall()
+                self.assertEqual(rows, [(5, 25, 0, str(KeyError), 'No best chromosome set', None)])
+                self.assertEqual(store.get_instances_results(), {'5': []})
+
+    def test_compressed_trace_rebuilds_step_curve(self):
+        scores = [9, 9, 7, 7, 7, 8, 5, 5, 5, 5, 2, 2]
+        for capacity, expected in [(16, scores), (4, [9, 9, 9, 9, 9, 8, 5, 5, 5, 5, 2, 2])]:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'results.sqlite')
+                with SolutionTracer('run', id=1, clues=30, store=path, compress=True, max_points=capacity) as tracer:
+                    for generation, score in enumerate(scores):
+                        tracer.record(score, 0.5 * generation, self.population[score].sudoku)
+                result = analysis.get_instances_results(path)['1'][0]
+                times, rebuilt = analysis.partial_trace(result)
+                self.assertEqual(rebuilt.tolist(), expected)
+                self.assertEqual(times.tolist(), [0.5 * generation for generation in range(len(scores))])
+                self.assertEqual(analysis.number_of_generations(result), len(scores))
+                self.assertTrue(np.array_equal(result['Solution'], self.population[2].sudoku))
+
+    def test_results_index_parses_only_new_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            rootdir = os.path.join(directory, 'results')
+            os.makedirs(os.path.join(rootdir, '3'))
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                for run in range(4):
+                    if run == 3:
+                        self.assertEqual(analysis.ResultsIndex(rootdir).refresh(), 3)
+                    with SolutionTracer(f'run{run}', id=3, clues=30) as tracer:
+                        for generation, ind in enumerate(self.population):
+                            tracer.update(ind, 0.1 * generation)
+            finally:
+                os.chdir(cwd)
+            expected = analysis.calculate_statistics(analysis.get_instances_results(rootdir))
+
+            self.assertEqual(analysis.ResultsIndex(rootdir).refresh(), 1)
+            index = analysis.ResultsIndex(rootdir)
+            self.assertEqual(index.refresh(), 0)
+            self.assertEqual(analysis.calculate_statistics(index.results()), expected)
+            for result in analysis.get_instances_results(rootdir)['3']:
+                times, scores = analysis.partial_trace(analysis.compress_result(result))
+                self.assertEqual(scores.tolist(), [score[0] for score in result['Partial scores']])
+
+    def test_parse_result_decodes_tracer_payload_with_plain_json(self):
+        result = {'Exit status': {'Finished normally': True, 'Exception type': 'None'},
+                  'Partial times': [0.5, 1.0], 'Partial scores': [(4,), (2.0,)], 'Solution': [[1, 2], [2, 1]]}
+        encoded = jsonpickle.encode(result)
+        self.assertIn('py/tuple', encoded)
+        decoded = analysis.parse_result(encoded)
+        self.assertEqual(decoded['Partial scores'], [[4], [2.0]])
+        self.assertEqual({**decoded, 'Partial scores': None}, {**result, 'Partial scores': None})
+        self.assertEqual(analysis.parse_result(jsonpickle.encode({'set': {1, 2}})), {'set': {1, 2}})
+
+    def test_calculate_statistics_groups_runs_of_instances(self):
+        valid = np.array([[(3 * (row % 3) + row // 3 + col) % 9 + 1 for col in range(9)] for row in range(9)])
+        invalid = valid.copy()
+        invalid[0, [0, 1]] = invalid[0, [1, 0]]
+
+        def run(solution, time, generations):
+            return {'Solution': solution, 'Partial times': [time / generations] * (generations - 1) + [time],
+                    'Partial scores': [(0,)] * generations}
+
+        results = {'1': [run(valid, 2.0, 3), run(invalid, 4.0, 5), run(valid, 6.0, 10)], '2': [run(invalid, 1.0, 1)]}
+        report = analysis.calculate_statistics(results, attach_all=True)
+
+        first = report['per_instance_stats'][1]
+        self.assertEqual((first['number_of_attempts'], first['number_of_attempts_solved']), (3, 2))
+        solved = first['statistics']['for_correctly_solved_attempts']
+        self.assertEqual((solved['time_average'], solved['time_min'], solved['time_max']), (4.0, 2.0, 6.0))
+        self.assertAlmostEqual(solved['time_std'], statistics.stdev([2.0, 6.0]))
+        self.assertEqual(solved['number_of_generations_raw_data'], [3, 10])
+        self.assertAlmostEqual(first['statistics']['for_all_attempts']['number_of_generations_std'],
+                               statistics.stdev([3, 5, 10]))
+        second = report['per_instance_stats'][2]['statistics']
+        self.assertIsNone(second['for_all_attempts']['time_std'])
+        self.assertIsNone(second['for_correctly_solved_attempts']['time_average'])
+        overall = report['overall_stats']
+        self.assertEqual((overall['number_of_attempts'], overall['number_of_attempts_solved']), (4, 2))
+        self.assertEqual(overall['statistics']['for_all_attempts']['time_raw_data'], [2.0, 4.0, 6.0, 1.0])
+        self.assertAlmostEqual(overall['statistics']['for_all_attempts']['time_average'], 13.0 / 4)
+
+    def test_trace_bands_match_resampled_step_curves(self):
+        traces = [([0.5, 1.0, 4.0], [9, 5, 0]), ([2.0, 3.0], [7, 3]), ([1.0], [6]), ([], [])]
+        grid = analysis.time_grid(traces, points=5)
+        self.assertTrue(np.allclose(grid, [0.5, 0.5 * 8 ** 0.25, 0.5 * 8 ** 0.5, 0.5 * 8 ** 0.75, 4.0]))
+
+        curves = analysis.resample_traces(traces, np.array([0.1, 1.0, 2.5, 3.0, 10.0]))
+        self.assertEqual(curves.tolist(), [[9, 5, 5, 5, 0], [7, 7, 7, 3, 3], [6, 6, 6, 6, 6]])
+
+        bands = analysis.TraceBands(np.array([0.1, 1.0, 2.5, 3.0, 10.0]), chunk_size=2).add_many(traces)
+        self.assertEqual(bands.count, 3)
+        self.assertEqual(bands.percentile(50).tolist(), [7, 6, 6, 5, 3])
+        self.assertEqual(bands.percentile(99).tolist(), curves.max(axis=0).tolist())
+        self.assertTrue(np.allclose(bands.mean(), curves.mean(axis=0)))
+        self.assertEqual(bands.minimum().tolist(), curves.min(axis=0).tolist())
+
+    def test_render_plots_writes_every_job(self):
+        traces = [([0.5, 1.0, 4.0], [9, 5, 0]), ([2.0, 3.0], [7, 3])]
+        times, scores = zip(*traces)
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = [
+                analysis.PlotJob('boxplot', ('box', [[1, 2, 3], [2, 4]], ['a', 'b'], 'x', 'y', (0, 5),
+                                             os.path.join(directory, 'box.png'))),
+                analysis.PlotJob('lineplot', ('line', [times], [scores], 'x', 'y', None, (0, 10), 90,
+                                              os.path.join(directory, 'line.png'))),
+                analysis.PlotJob('bandplot', ('band', traces, 'x', 'y', None, os.path.join(directory, 'band.png'))),
+            ]
+            analysis.render_plots(jobs, processes=2)
+            self.assertEqual(sorted(os.listdir(directory)), ['band.png', 'box.png', 'line.png'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+CLASSIC_SIZE = 9
+
+
+def box_size(size: int) -> int:
+    """
+    :param size: number of rows (and columns) of sudoku, e.g. 9, 16 or 25
+    :return: number of rows (and columns) of a single square
+    """
+    if size == CLASSIC_SIZE:
+        return 3
+    box = int(round(size ** 0.5))
+    if box * box != size:
+        raise ValueError(f'sudoku of size {size} can not be divided into squares')
+    return box
+
+
+@lru_cache(maxsize=None)
+def square_ranges(size: int) -> List[List[int]]:
+    """
+    :return: [begin, end) ranges of squares along one axis, [[0, 3], [3, 6], [6, 9]] for classic sudoku
+    """
+    box = box_size(size)
+    return [[begin, begin + box] for begin in range(0, size, box)]
+
+
+@lru_cache(maxsize=None)
+def units(size: int) -> Tuple[List[List[int]], List[Tuple[int, int, int]], List[List[int]]]:
+    """
+    Units of board with flat cell indexes: rows are units 0..size-1, then columns, then squares.
+    :return: cells of every unit, (row, column, square) units of every cell and peers of every cell
+    """
+    box = box_size(size)
+    cells = size * size
+    rows = [[row * size + col for col in range(size)] for row in range(size)]
+    columns = [[row * size + col for row in range(size)] for col in range(size)]
+    squares = [[((square // box) * box + row) * size + (square % box) * box + col
+                 for row in range(box) for col in range(box)] for square in range(size)]
+    cell_units = [(cell // size, size + cell % size, 2 * size + square_of(size, cell // size, cell % size))
+                  for cell in range(cells)]
+    all_units = rows + columns + squares
+    peers = [sorted(set(peer for unit in cell_units[cell] for peer in all_units[unit]) - {cell})
+             for cell in range(cells)]
+    return all_units, cell_units, peers
+
+
+def square_of(size: int, row: int, col: int) -> int:
+    box = box_size(size)
+    return (row // box) * box + col // box
+
+
+def to_squares(sudokus: np.ndarray) -> np.ndarray:
+    """
+    :param sudokus: array of shape (N, size, size)
+    :return: array of shape (N, size, size) where every row holds numbers of one square
+    """
+    n, size = sudokus.shape[0], sudokus.shape[-1]
+    box = box_size(size)
+    return sudokus.reshape(n, box, box, box, box).transpose(0, 1, 3, 2, 4).reshape(n, size, size)
@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+from multiprocessing import Pool
+
+from dfs import bitboard
+
+
+def count_solutions(puzzle: list) -> (int, list):
+    """
+    :param puzzle: sudoku instance as list of lists
+    :return: number of solutions (0, 1 or 2 meaning more than one) and canonical solution,
+    which is the first solution found by deterministic bitboard search
+    """
+    count, solution = bitboard.count_solutions(puzzle, limit=2)
+    return count, None if solution is None else solution.tolist()
+
+
+def annotate_dataset(dataset: dict, processes: int = None, chunksize: int = 16) -> dict:
+    """
+    Adds 'solutions_count' and 'canonical_solution' to every instance of dataset in place,
+    puzzles are checked in parallel
+    """
+    instances = [instance for level in dataset.values() for instance in level]
+    with Pool(processes) as pool:
+        results = pool.imap(count_solutions, [instance['puzzle'] for instance in instances], chunksize=chunksize)
+        for instance, (count, solution) in zip(instances, results):
+            instance['solutions_count'] = count
+            instance['canonical_solution'] = solution
+    return dataset
+
+
+def print_summary(dataset: dict) -> None:
+    for level, instances in dataset.items():
+        counts = [instance['solutions_count'] for instance in instances]
+        print(f'{level}: {len(instances)} instances, {counts.count(1)} unique, '
+              f'{counts.count(2)} with many solutions, {counts.count(0)} without solution')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Checks uniqueness of solutions of all instances in dataset file')
+    parser.add_argument('input', help='dataset file, e.g. data/new_instances_25_30_35_40.json')
+    parser.add_argument('-o', '--output', help='annotated dataset file, default: <input>_validated.json')
+    parser.add_argument('-p', '--processes', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        dataset = json.load(f)
+
+    annotate_dataset(dataset, args.processes)
+    print_summary(dataset)
+
+    output = args.output or '{}_validated.json'.format(os.path.splitext(args.input)[0])
+    with open(output, 'w') as f:
+        json.dump(dataset, f)
@@ -0,0 +1,46 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+import dataset_validation
+import tools
+from dfs import bitboard
+
+
+class DatasetValidationTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        instances = tools.load_instances('data/new_instances_25_30_35_40.json')
+        self.unique = instances['hard25'][0]['puzzle']
+        self.many = np.copy(self.unique)
+        self.many[:3] = 0
+        self.conflicting = np.copy(self.unique)
+        self.conflicting[0, :2] = 1
+
+    def test_annotate_dataset_counts_solutions(self):
+        dataset = {
+            'unique': [{'puzzle': self.unique.tolist()}],
+            'broken': [{'puzzle': self.many.tolist()}, {'puzzle': self.conflicting.tolist()}],
+        }
+        dataset_validation.annotate_dataset(dataset, processes=2, chunksize=1)
+
+        unique = dataset['unique'][0]
+        self.assertEqual(unique['solutions_count'], 1)
+        self.assertEqual(unique['canonical_solution'], bitboard.solve(self.unique).tolist())
+        self.assertEqual([instance['solutions_count'] for instance in dataset['broken']], [2, 0])
+        self.assertIsNotNone(dataset['broken'][0]['canonical_solution'])
+        self.assertIsNone(dataset['broken'][1]['canonical_solution'])
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            dataset_validation.print_summary(dataset)
+        self.assertEqual(output.getvalue().splitlines(), [
+            'unique: 1 instances, 1 unique, 0 with many solutions, 0 without solution',
+            'broken: 2 instances, 0 unique, 1 with many solutions, 1 without solution',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import time
+
+import numpy as np
+
+import tools
+from dfs import config
+from evaluation import _validate
+
+ALL_NUMBERS = 0x1FF  # bit n - 1 is set when number n is still available
+POPCOUNT = [bin(mask).count('1') for mask in range(ALL_NUMBERS + 1)]
+ROW = [cell // 9 for cell in range(81)]
+COLUMN = [cell % 9 for cell in range(81)]
+SQUARE = [(cell // 27) * 3 + (cell % 9) // 3 for cell in range(81)]
+
+
+def _solutions(puzzle):
+    """
+    Iterative DFS over 9-bit masks of numbers used in every row, column and square.
+    At every step the empty cell with the fewest candidates is filled first.
+    :param puzzle: sudoku instance, 0 marks empty cell
+    :return: generator of solutions as flat lists of 81 numbers
+    """
+    cells = [int(number) for number in np.asarray(puzzle).flatten()]
+    rows, columns, squares = [0] * 9, [0] * 9, [0] * 9
+    empty = []
+    for cell, number in enumerate(cells):
+        if number == 0:
+            empty.append(cell)
+            continue
+        bit = 1 << (number - 1)
+        if (rows[ROW[cell]] | columns[COLUMN[cell]] | squares[SQUARE[cell]]) & bit:
+            return  # clues are in conflict
+        rows[ROW[cell]] |= bit
+        columns[COLUMN[cell]] |= bit
+        squares[SQUARE[cell]] |= bit
+
+    stack = []  # (cell, placed bit, bits not tried yet)
+    while True:
+        if len(empty) == 0:
+            yield list(cells)
+            best_count = 0
+        else:
+            best_index, best_count, best_mask = -1, 10, 0
+            for index, cell in enumerate(empty):
+                mask = ALL_NUMBERS & ~(rows[ROW[cell]] | columns[COLUMN[cell]] | squares[SQUARE[cell]])
+                count = POPCOUNT[mask]
+                if count < best_count:
+                    best_index, best_count, best_mask = index, count, mask
+                    if count <= 1:
+                        break
+
+        if best_count > 0:
+            cell = empty[best_index]
+            empty[best_index] = empty[-1]
+            empty.pop()
+            bit = best_mask & -best_mask
+            remaining = best_mask ^ bit
+        else:
+            # backtrack to the last cell with untried numbers
+            while len(stack) > 0:
+                cell, bit, remaining = stack.pop()
+                rows[ROW[cell]] ^= bit
+                columns[COLUMN[cell]] ^= bit
+                squares[SQUARE[cell]] ^= bit
+                if remaining:
+                    break
+                cells[cell] = 0
+                empty.append(cell)
+            else:
+                return
+            bit = remaining & -remaining
+            remaining ^= bit
+
+        cells[cell] = bit.bit_length()
+        rows[ROW[cell]] |= bit
+        columns[COLUMN[cell]] |= bit
+        squares[SQUARE[cell]] |= bit
+        stack.append((cell, bit, remaining))
+
+
+def solve(puzzle):
+    """
+    :return: first solution found as (9, 9) array, None if puzzle has no solution
+    """
+    solution = next(_solutions(puzzle), None)
+    return None if solution is None else np.array(solution).reshape(9, 9)
+
+
+def count_solutions(puzzle, limit: int = 2) -> (int, np.ndarray):
+    """
+    Counts solutions and stops as soon as limit is reached, limit 2 is enough to check uniqueness
+    :return: number of solutions (at most limit) and first solution found, None if there is no solution
+    """
+    count, first = 0, None
+    for solution in _solutions(puzzle):
+        if first is None:
+            first = np.array(solution).reshape(9, 9)
+        count += 1
+        if count >= limit:
+            break
+    return count, first
+
+
+def test():
+    timings = []
+    repetitions = []
+
+    instances = tools.load_instances(os.path.join(os.path.dirname(__file__), '..', 'data',
+                                                  'new_instances_25_30_35_40.json'))
+    for i, instance in enumerate(instances['hard25'], start=1):
+        start = time.time()
+        solution = solve(instance['puzzle'])
+        end = time.time()
+
+        timings.append(end - start)
+        repetitions.append(_validate(solution))
+
+    print('     Timings:', timings)
+    print(' Repetitions:', repetitions)
+    print('Max time:', max(timings))
+
+
+def run(cfg: config.DFSConfig) -> None:
+    start = time.time()
+    solution = solve(cfg.sudoku_instance)
+    end = time.time()
+
+    print('solution found by bitboard DFS in {} seconds:'.format(end - start))
+    print(solution)
+    print('repetitions:', _validate(solution))
+    print('solution from dataset:')
+    print(cfg.sudoku_solution)
+    print('are they the same?', (solution == cfg.sudoku_solution).all())
+
+
+if __name__ == '__main__':
+    # cfg = config.DefaultConfig
+    # run(cfg)
+    test()
@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 import numpy as np
 
@@ -10,7 +11,7 @@ class DFSConfig:
     sudoku_solution: np.ndarray = None
 
 
-_sample_sudoku_instances = tools.load_instances("../data/instances.json")
+_sample_sudoku_instances = tools.load_instances(os.path.join(os.path.dirname(__file__), '..', 'data', 'instances.json'))
 
 DefaultConfig: DFSConfig = DFSConfig(
     sudoku_instance=_sample_sudoku_instances['easy'][0]['puzzle'],
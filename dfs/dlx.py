@@ -0,0 +1,225 @@
+import os
+import time
+
+import numpy as np
+
+import tools
+from dfs import config
+from evaluation import _validate
+
+COLUMNS = 324  # cell filled, number in row, number in column, number in square
+
+
+def _constraint_columns(row: int, col: int, number: int) -> tuple:
+    square = (row // 3) * 3 + col // 3
+    return (1 + row * 9 + col,
+            1 + 81 + row * 9 + number - 1,
+            1 + 162 + col * 9 + number - 1,
+            1 + 243 + square * 9 + number - 1)
+
+
+class DancingLinks:
+    """
+    Sudoku encoded as exact cover problem with 324 columns and up to 729 rows (one for every cell and number),
+    solved with Knuth's Algorithm X on doubly linked lists kept in flat integer lists.
+    Node 0 is the root, nodes 1-324 are column headers, rest are nodes of candidate rows.
+    """
+
+    def __init__(self, puzzle):
+        size = 1 + COLUMNS
+        self.left = list(range(-1, size - 1))
+        self.right = list(range(1, size + 1))
+        self.left[0], self.right[size - 1] = size - 1, 0
+        self.up = list(range(size))
+        self.down = list(range(size))
+        self.column = list(range(size))
+        self.sizes = [0] * size
+        self.candidate = [None] * size  # (row, col, number) of every node
+        self.consistent = True
+
+        grid = np.asarray(puzzle)
+        self.puzzle: np.ndarray = grid
+        clue_nodes = []
+        for row in range(9):
+            for col in range(9):
+                numbers = [grid[row, col]] if grid[row, col] > 0 else range(1, 10)
+                for number in numbers:
+                    first = self._add_row((row, col, int(number)), _constraint_columns(row, col, number))
+                    if grid[row, col] > 0:
+                        clue_nodes.append(first)
+
+        for node in clue_nodes:
+            if not self._select(node):
+                self.consistent = False
+                break
+
+    def _add_row(self, candidate: tuple, columns: tuple) -> int:
+        first = len(self.column)
+        for offset, column in enumerate(columns):
+            node = first + offset
+            self.left.append(first + (offset - 1) % len(columns))
+            self.right.append(first + (offset + 1) % len(columns))
+            self.up.append(self.up[column])
+            self.down.append(column)
+            self.down[self.up[column]] = node
+            self.up[column] = node
+            self.column.append(column)
+            self.candidate.append(candidate)
+            self.sizes[column] += 1
+        return first
+
+    def _cover(self, column: int) -> None:
+        left, right, up, down, columns, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        row = down[column]
+        while row != column:
+            node = right[row]
+            while node != row:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                sizes[columns[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def _uncover(self, column: int) -> None:
+        left, right, up, down, columns, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+        row = up[column]
+        while row != column:
+            node = left[row]
+            while node != row:
+                sizes[columns[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def _is_covered(self, column: int) -> bool:
+        return self.right[self.left[column]] != column
+
+    def _select(self, row: int) -> bool:
+        """
+        Permanently chooses given candidate row, used for clues
+        :return: False if any of its columns was already covered by another clue
+        """
+        node = row
+        while True:
+            if self._is_covered(self.column[node]):
+                return False
+            self._cover(self.column[node])
+            node = self.right[node]
+            if node == row:
+                return True
+
+    def solutions(self):
+        """
+        :return: generator of solutions as (9, 9) arrays
+        """
+        if not self.consistent:
+            return
+        yield from self._search([])
+
+    def _search(self, chosen: list):
+        right, down, sizes = self.right, self.down, self.sizes
+        if right[0] == 0:
+            yield self._solution(chosen)
+            return
+
+        # column with the fewest remaining rows
+        column, best = right[0], sizes[right[0]]
+        node = right[column]
+        while node != 0 and best > 1:
+            if sizes[node] < best:
+                column, best = node, sizes[node]
+            node = right[node]
+        if best == 0:
+            return
+
+        self._cover(column)
+        row = down[column]
+        while row != column:
+            chosen.append(row)
+            node = right[row]
+            while node != row:
+                self._cover(self.column[node])
+                node = right[node]
+
+            yield from self._search(chosen)
+
+            node = self.left[row]
+            while node != row:
+                self._uncover(self.column[node])
+                node = self.left[node]
+            chosen.pop()
+            row = down[row]
+        self._uncover(column)
+
+    def _solution(self, chosen: list) -> np.ndarray:
+        solution = np.array(self.puzzle, dtype=int)
+        for node in chosen:
+            row, col, number = self.candidate[node]
+            solution[row, col] = number
+        return solution
+
+
+def solve(puzzle):
+    """
+    :return: first solution found as (9, 9) array, None if puzzle has no solution
+    """
+    return next(DancingLinks(puzzle).solutions(), None)
+
+
+def count_solutions(puzzle, limit: int = 2) -> (int, np.ndarray):
+    """
+    Same as bitboard.count_solutions
+    :return: number of solutions (at most limit) and first solution found, None if there is no solution
+    """
+    count, first = 0, None
+    for solution in DancingLinks(puzzle).solutions():
+        if first is None:
+            first = solution
+        count += 1
+        if count >= limit:
+            break
+    return count, first
+
+
+def test():
+    timings = []
+    repetitions = []
+
+    instances = tools.load_instances(os.path.join(os.path.dirname(__file__), '..', 'data',
+                                                  'new_instances_25_30_35_40.json'))
+    for i, instance in enumerate(instances['hard25'], start=1):
+        start = time.time()
+        solution = solve(instance['puzzle'])
+        end = time.time()
+
+        timings.append(end - start)
+        repetitions.append(_validate(solution))
+
+    print('     Timings:', timings)
+    print(' Repetitions:', repetitions)
+    print('Max time:', max(timings))
+
+
+def run(cfg: config.DFSConfig) -> None:
+    start = time.time()
+    solution = solve(cfg.sudoku_instance)
+    end = time.time()
+
+    print('solution found by dancing links in {} seconds:'.format(end - start))
+    print(solution)
+    print('repetitions:', _validate(solution))
+    print('number of solutions (up to 2):', count_solutions(cfg.sudoku_instance)[0])
+    print('solution from dataset:')
+    print(cfg.sudoku_solution)
+    print('are they the same?', (solution == cfg.sudoku_solution).all())
+
+
+if __name__ == '__main__':
+    # cfg = config.DefaultConfig
+    # run(cfg)
+    test()
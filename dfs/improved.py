@@ -4,76 +4,35 @@ import yaml
 import numpy as np
 
 import tools
-from dfs import config
+from dfs import config, propagation
 from evaluation import is_row_valid, is_column_valid, is_square_valid, _validate
 
 
-def _preproccess_one_iteration(grid):
-    full_set = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-    possibilities = {}
-    slots_with_one_possibility = []
+def _preprocess_puzzle(puzzle, hidden_singles=False):
+    """
+    Fills cells forced by constraint propagation
+    :param hidden_singles: besides naked singles use hidden singles and locked candidates
+    :return: filled grid and possible values of every cell which is still empty
+    """
+    propagator = propagation.propagate(puzzle, hidden_singles=hidden_singles, locked_candidates=hidden_singles)
+    return propagator.grid, propagator.possibilities()
 
-    square_cache = {}
-    row_cache = {}
-    column_cache = {}
 
-    # create possible values of 1..9 for each cell
-    for row in range(0, 9):
-        for col in range(0, 9):
-            if grid[row][col] == 0:
-                # Create possible values in row and subtract from full set
-                in_row = row_cache[row] if row in row_cache else set(grid[row])
-                r = full_set - in_row
-
-                # Create possible values in column and subtract
-                in_column = column_cache[col] if col in column_cache else set(grid[:, col])
-                c = r - in_column
-
-                # Create possible values in square and subtract
-                square_id = square_vertical_id, square_horizontal_id = row // 3, col // 3
-
-                row_start = square_vertical_id * 3
-                col_start = square_horizontal_id * 3
-
-                in_square = square_cache[square_id] if square_id in square_cache else \
-                    set(grid[row_start:row_start + 3, col_start:col_start + 3].flatten())
-
-                possibilities_for_slot = list(c - in_square)
-                if len(possibilities_for_slot) == 1:
-                    slots_with_one_possibility.append((row, col, possibilities_for_slot[0]))
-                else:
-                    possibilities[(row, col)] = possibilities_for_slot
-
-    return possibilities, slots_with_one_possibility
-
-
-def _preprocess_puzzle(puzzle):
-    grid = np.copy(puzzle)
-
-    possibilities, slots_with_one_possibility = _preproccess_one_iteration(grid)
-    while len(slots_with_one_possibility) > 0:
-        for row, col, value in slots_with_one_possibility:
-            grid[row, col] = value
-        possibilities, slots_with_one_possibility = _preproccess_one_iteration(grid)
-
-    return grid, possibilities
-
-
-def sudoku_iterator(current_row, current_column):
+def sudoku_iterator(current_row, current_column, size=9):
     nrow = current_row + 1
     ncol = current_column
-    if nrow >= 9:
+    if nrow >= size:
         nrow = 0
         ncol = current_column + 1
     return nrow, ncol
 
 
 def _dfs(sudoku, possibilities, row=0, col=0):
-    if col == 9:
+    if col == sudoku.shape[1]:
         return sudoku
 
     if sudoku[row, col] != 0:  # if already filled
-        nrow, ncol = sudoku_iterator(row, col)
+        nrow, ncol = sudoku_iterator(row, col, sudoku.shape[0])
         return _dfs(sudoku, possibilities, nrow, ncol)
     else:
         for possible_number in possibilities[(row, col)]:
@@ -81,7 +40,7 @@ def _dfs(sudoku, possibilities, row=0, col=0):
             valid = is_row_valid(sudoku, row, col) and is_column_valid(sudoku, row, col) and is_square_valid(sudoku,
                                                                                                              row, col)
             if valid:
-                nrow, ncol = sudoku_iterator(row, col)
+                nrow, ncol = sudoku_iterator(row, col, sudoku.shape[0])
                 solution = _dfs(sudoku, possibilities, nrow, ncol)
                 if solution is not None:
                     return solution
@@ -93,6 +52,11 @@ def _dfs(sudoku, possibilities, row=0, col=0):
         return None
 
 
+def solve(puzzle):
+    puzzle, possibilities = _preprocess_puzzle(puzzle)
+    return _dfs(puzzle, possibilities)
+
+
 def test():
     timings = []
     repetitions = []
@@ -129,8 +93,9 @@ def test():
 def run(cfg: config.DFSConfig) -> None:
     sudoku = cfg.sudoku_instance
     print('not preprocessed sudoku:', np.count_nonzero(sudoku == 0), 'slots to fill')
-    preproccessed_sudoku, _ = _preprocess_puzzle(sudoku)
-    print('preprocessed sudoku:', np.count_nonzero(preproccessed_sudoku == 0), 'slots to fill')
+    propagator = propagation.propagate(sudoku)
+    print('preprocessed sudoku:', np.count_nonzero(propagator.grid == 0), 'slots to fill,',
+          propagator.deduced, 'cells deduced')
     return
 
     start = time.time()
@@ -0,0 +1,145 @@
+from collections import deque
+
+import numpy as np
+
+import board
+
+# bit n - 1 of a candidate mask is set when number n is a candidate
+# units 0-8 are rows, 9-17 are columns, 18-26 are squares
+UNITS, CELL_UNITS, PEERS = board.units(board.CLASSIC_SIZE)
+
+
+class Propagator:
+    """
+    Keeps candidate masks of every cell and updates them incrementally,
+    every assignment touches only peers of the assigned cell.
+    Work queue holds cells with a single candidate (naked singles) and units whose candidates changed,
+    which are checked for hidden singles and locked candidates.
+    """
+
+    def __init__(self, puzzle, hidden_singles: bool = True, locked_candidates: bool = True):
+        self.hidden_singles: bool = hidden_singles
+        self.locked_candidates: bool = locked_candidates
+        self.grid: np.ndarray = np.copy(puzzle)
+        self.size: int = self.grid.shape[0]
+        self.box: int = board.box_size(self.size)
+        if self.size == board.CLASSIC_SIZE:
+            self.units, self.cell_units, self.peers = UNITS, CELL_UNITS, PEERS
+        else:
+            self.units, self.cell_units, self.peers = board.units(self.size)
+        self.all_numbers: int = (1 << self.size) - 1
+        self.cells = [int(number) for number in self.grid.flatten()]
+        self.candidates = [self.all_numbers] * len(self.cells)
+        self.deduced: int = 0
+        self.contradiction: bool = False
+        self._singles = deque()
+        self._dirty_units = deque(range(len(self.units)))
+        self._is_dirty = [True] * len(self.units)
+
+        used = [0] * len(self.units)
+        for cell, number in enumerate(self.cells):
+            if number > 0:
+                bit = 1 << (number - 1)
+                for unit in self.cell_units[cell]:
+                    if used[unit] & bit:
+                        self.contradiction = True
+                    used[unit] |= bit
+        for cell, number in enumerate(self.cells):
+            if number > 0:
+                self.candidates[cell] = 1 << (number - 1)
+            else:
+                row, column, square = self.cell_units[cell]
+                self._eliminate(cell, used[row] | used[column] | used[square])
+
+    def _eliminate(self, cell: int, bits: int) -> None:
+        mask = self.candidates[cell]
+        if self.cells[cell] > 0 or not mask & bits:
+            return
+        mask &= ~bits
+        self.candidates[cell] = mask
+        if mask == 0:
+            self.contradiction = True
+        elif mask & (mask - 1) == 0:
+            self._singles.append(cell)
+        for unit in self.cell_units[cell]:
+            if not self._is_dirty[unit]:
+                self._is_dirty[unit] = True
+                self._dirty_units.append(unit)
+
+    def assign(self, cell: int, number: int) -> None:
+        bit = 1 << (number - 1)
+        if not self.candidates[cell] & bit:
+            self.contradiction = True
+            return
+        self.cells[cell] = number
+        self.candidates[cell] = bit
+        self.deduced += 1
+        for peer in self.peers[cell]:
+            self._eliminate(peer, bit)
+        for unit in self.cell_units[cell]:
+            if not self._is_dirty[unit]:
+                self._is_dirty[unit] = True
+                self._dirty_units.append(unit)
+
+    def _check_unit(self, unit: int) -> None:
+        cells = self.units[unit]
+        placed = 0
+        for cell in cells:
+            if self.cells[cell] > 0:
+                placed |= 1 << (self.cells[cell] - 1)
+        missing = self.all_numbers & ~placed
+        while missing and not self.contradiction:
+            bit = missing & -missing
+            missing ^= bit
+            places = [cell for cell in cells if self.cells[cell] == 0 and self.candidates[cell] & bit]
+            if len(places) == 0:
+                self.contradiction = True
+            elif len(places) == 1 and self.hidden_singles:
+                self.assign(places[0], bit.bit_length())
+            elif len(places) <= self.box and self.locked_candidates:
+                self._eliminate_locked(unit, places, bit)
+
+    def _eliminate_locked(self, unit: int, places: list, bit: int) -> None:
+        """
+        If all places of a number in a square share a row or column, number is removed from the rest of it
+        (pointing), if all places in a row or column share a square, it is removed from the rest of square (claiming).
+        """
+        shared_units = set(self.cell_units[places[0]])
+        for cell in places[1:]:
+            shared_units &= set(self.cell_units[cell])
+        shared_units.discard(unit)
+        for shared_unit in shared_units:
+            for cell in self.units[shared_unit]:
+                if cell not in places:
+                    self._eliminate(cell, bit)
+
+    def propagate(self) -> 'Propagator':
+        while not self.contradiction:
+            if len(self._singles) > 0:
+                cell = self._singles.popleft()
+                if self.cells[cell] == 0:
+                    self.assign(cell, self.candidates[cell].bit_length())
+            elif len(self._dirty_units) > 0 and (self.hidden_singles or self.locked_candidates):
+                unit = self._dirty_units.popleft()
+                self._is_dirty[unit] = False
+                self._check_unit(unit)
+            else:
+                break
+        self.grid = np.array(self.cells, dtype=self.grid.dtype).reshape(self.size, self.size)
+        return self
+
+    def possibilities(self) -> dict:
+        """
+        :return: possible values of every empty cell in format used by DFS, {(row, col): [numbers]}
+        """
+        size = self.size
+        return {(cell // size, cell % size): [number for number in range(1, size + 1)
+                                              if self.candidates[cell] & (1 << (number - 1))]
+                for cell in range(len(self.cells)) if self.cells[cell] == 0}
+
+
+def propagate(puzzle, hidden_singles: bool = True, locked_candidates: bool = True) -> Propagator:
+    """
+    :return: propagator with filled grid, candidates of remaining cells and number of deduced cells
+    """
+    return Propagator(puzzle, hidden_singles, locked_candidates).propagate()
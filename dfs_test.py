@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+import tools
+from dfs import bitboard, dlx, improved, propagation
+from evaluation import _validate
+
+
+class DFSTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        instances = tools.load_instances('data/new_instances_25_30_35_40.json')
+        self.puzzles = [instance['puzzle'] for level in instances.values() for instance in level[:10]]
+
+    def assertSolves(self, puzzle, solution):
+        self.assertIsNotNone(solution)
+        self.assertEqual(_validate(solution), 0)
+        self.assertTrue((solution[puzzle > 0] == puzzle[puzzle > 0]).all())
+
+    def test_bitboard_solves_all_levels(self):
+        for puzzle in self.puzzles:
+            self.assertSolves(puzzle, bitboard.solve(puzzle))
+
+    def test_bitboard_counts_solutions_up_to_limit(self):
+        empty = np.zeros((9, 9), dtype=int)
+        self.assertEqual(bitboard.count_solutions(empty, limit=2)[0], 2)
+        solution = bitboard.solve(self.puzzles[0])
+        self.assertEqual(bitboard.count_solutions(solution)[0], 1)
+        self.assertTrue((bitboard.count_solutions(solution)[1] == solution).all())
+
+    def test_bitboard_rejects_conflicting_clues(self):
+        puzzle = np.copy(self.puzzles[0])
+        puzzle[0, :2] = 1
+        self.assertIsNone(bitboard.solve(puzzle))
+
+    def test_dlx_solves_and_counts_like_bitboard(self):
+        for puzzle in self.puzzles:
+            self.assertSolves(puzzle, dlx.solve(puzzle))
+            expected, _ = bitboard.count_solutions(puzzle, limit=3)
+            count, solution = dlx.count_solutions(puzzle, limit=3)
+            self.assertEqual(count, expected)
+            self.assertSolves(puzzle, solution)
+
+    def test_dlx_rejects_conflicting_clues(self):
+        puzzle = np.copy(self.puzzles[0])
+        puzzle[0, :2] = 1
+        self.assertIsNone(dlx.solve(puzzle))
+        self.assertEqual(dlx.count_solutions(puzzle), (0, None))
+
+    def test_propagation_deduces_cells_of_solution(self):
+        for puzzle in self.puzzles:
+            solution = bitboard.solve(puzzle)
+            propagator = propagation.propagate(puzzle)
+            filled = (propagator.grid > 0) & (puzzle == 0)
+            self.assertFalse(propagator.contradiction)
+            self.assertEqual(propagator.deduced, np.count_nonzero(filled))
+            self.assertTrue((propagator.grid[filled] == solution[filled]).all())
+            for (row, col), values in propagator.possibilities().items():
+                self.assertIn(solution[row, col], values)
+
+    def test_improved_dfs_solves_preprocessed_puzzles(self):
+        for puzzle in self.puzzles[:20]:
+            self.assertSolves(puzzle, improved.solve(puzzle))
+
+    def test_improved_dfs_solves_16x16_puzzle(self):
+        rows, cols = np.indices((16, 16))
+        solution = (4 * (rows % 4) + rows // 4 + cols) % 16 + 1
+        puzzle = np.where(np.random.RandomState(0).rand(16, 16) < 0.5, solution, 0)
+        self.assertSolves(puzzle, improved.solve(puzzle))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,9 @@
-from typing import Tuple
+from typing import Tuple, List
 
 import numpy as np
 
-from evolutionary.chromosome import Chromosome
+from board import box_size, square_ranges, to_squares
+from evolutionary.chromosome import Chromosome, count_digits
 
 
 def check_repetitions(row) -> int:
@@ -14,13 +15,30 @@ def check_repetitions(row) -> int:
     for el in row:
         numbers.add(el)
 
-    return 9 - len(numbers)
+    return len(row) - len(numbers)
 
 
 def validate_chromosome(chromosome: Chromosome) -> Tuple[int]:
+    chromosome.recount()
     return _validate(chromosome.sudoku),
 
 
+def validate_chromosomes(chromosomes: List[Chromosome]) -> List[Tuple[int]]:
+    """
+    Batched counterpart of validate_chromosome, evaluates all chromosomes at once
+    and refreshes their digit-count tables
+    :param chromosomes: chromosomes to be evaluated
+    :return: list of fitness tuples in the same order as chromosomes
+    """
+    if len(chromosomes) == 0:
+        return []
+    sudokus = np.stack([chromosome.sudoku for chromosome in chromosomes])
+    row_counts, column_counts = count_digits(sudokus)
+    for chromosome, rows, columns in zip(chromosomes, row_counts, column_counts):
+        chromosome.row_counts, chromosome.column_counts = rows, columns
+    return [(int(value),) for value in validate_population(sudokus)]
+
+
 def validate_sudoku(sudoku: list) -> bool:  # list of lists as input
     return _validate(np.array(sudoku)) == 0
 
@@ -41,7 +59,7 @@ def _validate(sudoku: np.ndarray) -> int:
     for j in range(ylen):
         total_repetitions += check_repetitions(sudoku[:, j])
 
-    ranges = [[0, 3], [3, 6], [6, 9]]
+    ranges = square_ranges(xlen)
     for xbegin, xend in ranges:
         for ybegin, yend in ranges:
             square: np.ndarray = sudoku[xbegin:xend, ybegin:yend]
@@ -50,6 +68,27 @@ def _validate(sudoku: np.ndarray) -> int:
     return total_repetitions
 
 
+def _count_repetitions(groups: np.ndarray) -> np.ndarray:
+    """
+    :param groups: array of shape (..., size) with groups of numbers in the last axis
+    :return: amount of number repetitions in every group
+    """
+    ordered = np.sort(groups, axis=-1)
+    distinct = 1 + np.count_nonzero(ordered[..., 1:] != ordered[..., :-1], axis=-1)
+    return groups.shape[-1] - distinct
+
+
+def validate_population(sudokus: np.ndarray) -> np.ndarray:
+    """
+        Vectorized version of _validate for stacked sudokus
+        :param sudokus: array of shape (N, size, size)
+        :return: array of shape (N,) with number of collisions of every sudoku
+    """
+    rows = _count_repetitions(sudokus).sum(axis=1)
+    columns = _count_repetitions(sudokus.transpose(0, 2, 1)).sum(axis=1)
+    return rows + columns + _count_repetitions(to_squares(sudokus)).sum(axis=1)
+
+
 def is_row_valid(sudoku, row, col):
     number = sudoku[row, col]
     return np.count_nonzero(sudoku[row, :] == number) <= 1
@@ -62,7 +101,8 @@ def is_column_valid(sudoku, row, col):
 
 def is_square_valid(sudoku, row, col):
     number = sudoku[row, col]
-    row_start = (row // 3) * 3
-    col_start = (col // 3) * 3
-    square = sudoku[row_start:row_start + 3, col_start:col_start + 3].flatten()
+    box = box_size(sudoku.shape[0])
+    row_start = (row // box) * box
+    col_start = (col // box) * box
+    square = sudoku[row_start:row_start + box, col_start:col_start + box].flatten()
     return np.count_nonzero(square == number) <= 1
@@ -1,5 +1,5 @@
 import unittest
-from evaluation import _validate
+from evaluation import _validate, validate_population
 import numpy as np
 
 
@@ -51,6 +51,23 @@ class EvaluationTestCase(unittest.TestCase):
     def test_evaluation_correct(self):
         self.assertEqual(_validate(self.correct_sudoku), 0)
 
+    def test_population_evaluation_matches_single(self):
+        random_sudokus = np.random.RandomState(0).randint(0, 10, (50, 9, 9))
+        sudokus = np.concatenate([
+            np.stack([self.sudoku_with_bad_rows, self.sudoku_with_bad_columns, self.correct_sudoku]),
+            random_sudokus
+        ])
+        expected = [_validate(sudoku) for sudoku in sudokus]
+        self.assertEqual(validate_population(sudokus).tolist(), expected)
+
+    def test_16x16_evaluation_matches_single(self):
+        rows, cols = np.indices((16, 16))
+        correct = (4 * (rows % 4) + rows // 4 + cols) % 16 + 1
+        sudokus = np.concatenate([correct[None], np.random.RandomState(0).randint(1, 17, (20, 16, 16))])
+        expected = [_validate(sudoku) for sudoku in sudokus]
+        self.assertEqual(expected[0], 0)
+        self.assertEqual(validate_population(sudokus).tolist(), expected)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,28 +1,52 @@
 import random
 import numpy as np
-from evaluation import validate_chromosome
+from dfs import propagation
+from evaluation import validate_chromosome, validate_chromosomes
 from evolutionary import chromosome, config, mutations, crossovers
+from evolutionary.context import PuzzleContext
+from evolutionary.engine import GenerationEngine
+from evolutionary.population import PopulationArray
 from deap import creator, tools, base
 
 from tools import Timer, SolutionTracer
 
 
-def generate_chromosome(cls, sudoku, sudoku_generating_function):
-    return cls(sudoku, sudoku_generating_function)
+def generate_chromosome(cls, context, sudoku_generating_function):
+    return cls(context, sudoku_generating_function)
+
+
+def generate_population(cls, context, n):
+    sudokus = chromosome.generate_random_sudoku_instances_with_square_constraints(context, n)
+    return [cls(context, lambda _, sudoku=sudoku: sudoku) for sudoku in sudokus]
 
 
 creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
 creator.create("Individual", chromosome.Chromosome, fitness=creator.FitnessMin)
-TOURNAMENT_SIZE = 2
+
+
+def create_context(cfg: config.EvolutionConfig) -> PuzzleContext:
+    """
+    With cfg.prefill, cells deduced by constraint propagation become starting points.
+    """
+    if cfg.prefill:
+        return PuzzleContext(propagation.propagate(cfg.sudoku_instance).grid)
+    return PuzzleContext(cfg.sudoku_instance)
+
+
+def create_engine(cfg: config.EvolutionConfig) -> GenerationEngine:
+    return GenerationEngine(create_context(cfg), cfg.population_size, cfg.crossover_probability,
+                            cfg.mutation_probability, cfg.child_per_parent, cfg.tournament_size)
 
 
 def create_toolbox(cfg: config.EvolutionConfig):
     toolbox = base.Toolbox()
-    toolbox.register("individual", generate_chromosome, creator.Individual, cfg.sudoku_instance,
+    context = create_context(cfg)
+    toolbox.register("individual", generate_chromosome, creator.Individual, context,
                      chromosome.generate_random_sudoku_instance_with_square_constraints)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("population", generate_population, creator.Individual, context)
     toolbox.register("evaluate", validate_chromosome)
-    toolbox.register("select_t", tools.selTournament, tournsize=TOURNAMENT_SIZE)
+    toolbox.register("evaluate_many", validate_chromosomes)
+    toolbox.register("select_t", tools.selTournament, tournsize=cfg.tournament_size)
     toolbox.register("select_b", tools.selBest)
     toolbox.register("mate_r", crossovers.swap_rows)
     toolbox.register("mate_c", crossovers.swap_columns)
@@ -35,22 +59,27 @@ def create_toolbox(cfg: config.EvolutionConfig):
 
 
 def run(cfg: config.EvolutionConfig) -> None:
+    if cfg.use_population_array:
+        return run_population_array(cfg)
+
     toolbox = create_toolbox(cfg)
 
     population = toolbox.population(n=cfg.population_size)
-    fitnesses = [toolbox.evaluate(el) for el in population]
+    fitnesses = toolbox.evaluate_many(population)
     for ind, fit in zip(population, fitnesses):
         ind.fitness.values = fit
 
-    CXPB, MXPB = 0.3, 0.3
-    child_per_parent = 2
+    CXPB, MXPB = cfg.crossover_probability, cfg.mutation_probability
+    child_per_parent = cfg.child_per_parent
 
     i = 0
     with Timer() as timer, SolutionTracer(
-            filename=f"Evolutionary_CXPB_{CXPB}_MXPB_TS_{TOURNAMENT_SIZE}_{MXPB}_CPP_{child_per_parent}_I_{cfg.max_iterations}_PS_{cfg.population_size}",
+            filename=f"Evolutionary_CXPB_{CXPB}_MXPB_TS_{cfg.tournament_size}_{MXPB}_CPP_{child_per_parent}_I_{cfg.max_iterations}_PS_{cfg.population_size}",
             max_repetitions=cfg.max_iterations,
             id=cfg.id,
-            clues=cfg.clues
+            clues=cfg.clues,
+            store=cfg.results_store,
+            compress=cfg.compress_trace
     ) as solution_tracer:
         while cfg.max_iterations > i:
             i += 1
@@ -74,10 +103,9 @@ def run(cfg: config.EvolutionConfig) -> None:
                         toolbox.mutate_swap_many(mutant)
                     else:
                         toolbox.mutate_swap_one(mutant)
-                    del mutant.fitness.values
 
             invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-            fitnesses = map(toolbox.evaluate, invalid_ind)
+            fitnesses = toolbox.evaluate_many(invalid_ind)
             for ind, fit in zip(invalid_ind, fitnesses):
                 ind.fitness.values = fit
 
@@ -93,7 +121,7 @@ def run(cfg: config.EvolutionConfig) -> None:
             population = toolbox.select_t(population, cfg.population_size)
 
             # saving and checking stats
-            best = tools.selBest(population, 1)[0]
+            best = min(population, key=lambda ind: ind.fitness.values[0])
             solution_tracer.update(best, timer.elapsed)
             if best.fitness.values[0] == 0:
                 break
@@ -106,15 +134,76 @@ def run(cfg: config.EvolutionConfig) -> None:
     print(best.sudoku)
 
 
+def run_population_array(cfg: config.EvolutionConfig) -> None:
+    """
+    Same evolution as in run, but population is kept in preallocated arenas of GenerationEngine
+    and all operators work on whole population at once.
+    """
+    CXPB, MXPB = cfg.crossover_probability, cfg.mutation_probability
+    child_per_parent = cfg.child_per_parent
+
+    engine = create_engine(cfg)
+
+    i = 0
+    with Timer() as timer, SolutionTracer(
+            filename=f"Evolutionary_CXPB_{CXPB}_MXPB_TS_{cfg.tournament_size}_{MXPB}_CPP_{child_per_parent}_I_{cfg.max_iterations}_PS_{cfg.population_size}",
+            max_repetitions=cfg.max_iterations,
+            id=cfg.id,
+            clues=cfg.clues,
+            store=cfg.results_store,
+            compress=cfg.compress_trace
+    ) as solution_tracer:
+        while cfg.max_iterations > i:
+            i += 1
+            engine.step()
+
+            # saving and checking stats
+            best = engine.best_index()
+            best_score = int(engine.parents.fitness[best])
+            solution_tracer.record(best_score, timer.elapsed, engine.parents.genomes[best])
+            if best_score == 0:
+                break
+            if i % 100 == 0:
+                print(i, best_score)
+                print(engine.parents.sudokus[best])
+
+    best = _individual_from_population(engine.parents, engine.best_index())
+    print(best.fitness)
+    print(best.sudoku)
+
+
+def solve(cfg: config.EvolutionConfig) -> (np.ndarray, int):
+    """
+    Runs evolution of run_population_array without tracing and printing, stops at first solution
+    :return: best sudoku found and its fitness
+    """
+    engine = create_engine(cfg)
+    for _ in range(cfg.max_iterations):
+        engine.step()
+        if engine.parents.fitness[engine.best_index()] == 0:
+            break
+    best = engine.best_index()
+    return engine.parents.sudokus[best].astype(int), int(engine.parents.fitness[best])
+
+
+def _individual_from_population(population: PopulationArray, index: int) -> creator.Individual:
+    sudoku = population.sudokus[index].astype(int)
+    individual = creator.Individual(population.context, lambda _: sudoku)
+    individual.fitness.values = (int(population.fitness[index]),)
+    return individual
+
+
 def choose_unique(population: creator.Individual):
+    """
+    Removes duplicated sudokus, first occurrences are kept in original order.
+    Sudokus are compared by raw bytes of their values converted to uint8, like genomes of PopulationArray.
+    """
+    seen = set()
     population_set = []
     for el in population:
-        duplicate = False
-        for unique_el in population_set:
-            if (unique_el.sudoku == el.sudoku).all():
-                duplicate = True
-                break
-        if not duplicate:
+        key = np.asarray(el.sudoku, dtype=np.uint8).tobytes()
+        if key not in seen:
+            seen.add(key)
             population_set.append(el)
     return population_set
 
@@ -1,85 +1,151 @@
 from typing import List, Tuple, Callable
 import numpy as np
 
+from board import CLASSIC_SIZE, box_size
+from evolutionary.context import PuzzleContext
+
 
 class Chromosome:
 
-    def __init__(self, sudoku_instance: np.ndarray,
-                 sudoku_generating_func: Callable[[np.ndarray], Tuple[np.ndarray, List[Tuple]]]):
-        sudoku, starting_points = sudoku_generating_func(sudoku_instance)
+    def __init__(self, context: PuzzleContext, sudoku_generating_func: Callable[[PuzzleContext], np.ndarray]):
+        sudoku = sudoku_generating_func(context)
         if self.has_correct_dimensions(sudoku):
-            self.sudoku_instance: np.ndarray = sudoku_instance
-            self.starting_points: List[Tuple] = starting_points
+            self.context: PuzzleContext = context
             self.sudoku: np.ndarray = sudoku
+            self.row_counts, self.column_counts = count_digits(sudoku)
         else:
             raise Exception("Wrong data passed as sudoku instance!")
 
+    @property
+    def sudoku_instance(self) -> np.ndarray:
+        return self.context.sudoku_instance
+
+    @property
+    def starting_points(self) -> List[Tuple]:
+        return self.context.starting_points
+
     @staticmethod
     def has_correct_dimensions(sudoku: np.ndarray) -> bool:
-        return sudoku.shape == (9, 9)
+        if sudoku.shape == (CLASSIC_SIZE, CLASSIC_SIZE):
+            return True
+        if sudoku.ndim != 2 or sudoku.shape[0] != sudoku.shape[1]:
+            return False
+        try:
+            box_size(sudoku.shape[0])
+        except ValueError:
+            return False
+        return True
+
+    def recount(self) -> None:
+        """
+        Rebuilds per-row and per-column digit-count tables after the sudoku was changed as a whole
+        """
+        self.row_counts, self.column_counts = count_digits(self.sudoku)
+
+    def swap_in_square(self, x1: int, y1: int, x2: int, y2: int) -> int:
+        """
+        Swaps two cells of the same square and keeps digit-count tables up to date.
+        Square repetitions are not affected by such swap, so only two rows and two columns are checked.
+        :return: change of number of collisions caused by the swap
+        """
+        a, b = self.sudoku[x1, y1], self.sudoku[x2, y2]
+        self.sudoku[x1, y1], self.sudoku[x2, y2] = b, a
+        if a == b:
+            return 0
+        delta = 0
+        if x1 != x2:
+            delta += _move_digit(self.row_counts[x1], a, b) + _move_digit(self.row_counts[x2], b, a)
+        if y1 != y2:
+            delta += _move_digit(self.column_counts[y1], a, b) + _move_digit(self.column_counts[y2], b, a)
+        return delta
+
+
+def _move_digit(counts: np.ndarray, removed: int, added: int) -> int:
+    """
+    Replaces one occurrence of removed digit with added digit in a digit-count table
+    :return: change of number of repetitions in the counted group
+    """
+    delta = 0
+    counts[removed] -= 1
+    if counts[removed] == 0:
+        delta += 1
+    if counts[added] == 0:
+        delta -= 1
+    counts[added] += 1
+    return delta
 
 
-def create_random(sudoku_instance: np.ndarray, amount: int = 1) -> List[Chromosome]:
+def count_digits(sudokus: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts occurrences of numbers 0-size in every row and column
+    :param sudokus: array of shape (..., size, size)
+    :return: row counts and column counts, both of shape (..., size, size + 1)
+    """
+    one_hot = sudokus[..., np.newaxis] == np.arange(sudokus.shape[-1] + 1)
+    return one_hot.sum(axis=-2), one_hot.sum(axis=-3)
+
+
+def create_random(context: PuzzleContext, amount: int = 1) -> List[Chromosome]:
     chromosomes: List[Chromosome] = []
     for _ in range(amount):
-        chromosomes.append(Chromosome(*generate_random_sudoku_instance(sudoku_instance)))
+        chromosomes.append(Chromosome(context, generate_random_sudoku_instance))
     return chromosomes
 
 
-def generate_random_sudoku_instance(sudoku: np.ndarray) -> (np.ndarray, List[Tuple]):
-    points = np.where(sudoku > 0)
-    static_points = [(x, y) for x, y in zip(points[0], points[1])]
-    sudoku_instance = np.random.randint(1, 10, (9, 9))
-    for x, y in static_points:
-        sudoku_instance[x, y] = sudoku[x, y]
-    return sudoku_instance, static_points
+def generate_random_sudoku_instance(context: PuzzleContext) -> np.ndarray:
+    sudoku_instance = np.random.randint(1, context.size + 1, context.sudoku_instance.shape)
+    sudoku_instance[context.fixed] = context.sudoku_instance[context.fixed]
+    return sudoku_instance
 
 
-def generate_random_sudoku_instance_with_row_constraints(sudoku: np.ndarray) -> (np.ndarray, List[Tuple]):
+def generate_random_sudoku_instance_with_row_constraints(context: PuzzleContext) -> np.ndarray:
     """
-    Uses every number only 9 times.
-    Sudoku created by creating permutation in range 1-9 9 times.
-    :param sudoku instance to be solved
+    Uses every number only size times.
+    Sudoku created by creating permutation in range 1-size for every row.
+    :param context: context of instance to be solved
     :return:
     """
-    points = np.where(sudoku > 0)
-    starting_points = [(x, y) for x, y in zip(points[0], points[1])]
-    sudoku_instance = np.copy(sudoku)
-    for i in range(0, 9):
-        sudoku_instance[i, :] = np.random.permutation(range(1, 10))
-    for x, y in starting_points:
-        sudoku_instance[x, y] = sudoku[x, y]
-    return sudoku_instance, starting_points
+    sudoku_instance = np.copy(context.sudoku_instance)
+    for i in range(0, context.size):
+        sudoku_instance[i, :] = np.random.permutation(range(1, context.size + 1))
+    sudoku_instance[context.fixed] = context.sudoku_instance[context.fixed]
+    return sudoku_instance
 
 
-def generate_random_sudoku_instance_with_square_constraints(sudoku: np.ndarray) -> (np.ndarray, List[Tuple]):
+def generate_random_sudoku_instance_with_square_constraints(context: PuzzleContext) -> np.ndarray:
     """
-    In each square numbers from 1-9 are chosen without repetitions.
-    :param sudoku: instance to be solved
+    In each square numbers from 1-size are chosen without repetitions.
+    :param context: context of instance to be solved
     :return:
     """
-    ranges = [[0, 3], [3, 6], [6, 9]]
-    points = np.where(sudoku > 0)
-    starting_points = [(x, y) for x, y in zip(points[0], points[1])]
-    sudoku_instance = np.copy(sudoku)
-    for xbegin, xend in ranges:
-        for ybegin, yend in ranges:
-            available_numbers = set(range(1, 10))
-            static_points = []
-            for x, y in starting_points:
-                if xbegin <= x < xend and ybegin <= y < yend:
-                    static_points.append((x, y))
-                    available_numbers.remove(sudoku_instance[x, y])
-            random_numbers = list(np.random.permutation(list(available_numbers)))
-            for x in range(xbegin, xend):
-                for y in range(ybegin, yend):
-                    if (x, y) not in static_points:
-                        sudoku_instance[x, y] = random_numbers.pop()
-                    else:
-                        sudoku_instance[x, y] = sudoku[x, y]
-    return sudoku_instance, starting_points
+    sudoku_instance = np.copy(context.sudoku_instance)
+    for square in range(context.size):
+        cells = context.free_cells[square, :context.free_counts[square]]
+        sudoku_instance.flat[cells] = np.random.permutation(context.missing_numbers[square])
+    return sudoku_instance
+
+
+def generate_random_sudoku_instances_with_square_constraints(context: PuzzleContext, amount: int,
+                                                             dtype=int) -> np.ndarray:
+    """
+    Batched generate_random_sudoku_instance_with_square_constraints.
+    Missing numbers of every square are shuffled for all sudokus at once by sorting random keys.
+    :param context: context of instance to be solved
+    :param amount: number of sudokus to generate
+    :param dtype: type of generated sudokus
+    :return: array of shape (amount, size, size)
+    """
+    size = context.size
+    sudokus = np.empty((amount, size * size), dtype=dtype)
+    sudokus[:] = context.sudoku_instance.flatten()
+    for square in range(size):
+        count = context.free_counts[square]
+        if count == 0:
+            continue
+        order = np.argsort(np.random.random((amount, count)), axis=1)
+        sudokus[:, context.free_cells[square, :count]] = context.missing_numbers[square][order]
+    return sudokus.reshape(amount, size, size)
 
 
 def set_back_starting_points(ind) -> None:
-    for x, y in ind.starting_points:
-        ind.sudoku[x, y] = ind.sudoku_instance[x, y]
+    ind.sudoku[ind.context.fixed] = ind.sudoku_instance[ind.context.fixed]
@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 import numpy as np
 
@@ -11,6 +12,24 @@ class EvolutionConfig:
     clues: int
     max_iterations: int
     population_size: int
+    use_population_array: bool = False
+    prefill: bool = False  # fix cells deduced by naked and hidden singles before evolution
+    results_store: str = None  # path of results_store.ResultsStore, results/{id}/ files are written if not set
+    compress_trace: bool = False  # trace only generations in which best score changed, see tools.Trace
+    # parameters of genetic operators, shared by DEAP loop, GenerationEngine, islands and portfolio
+    crossover_probability: float = 0.3
+    mutation_probability: float = 0.3
+    child_per_parent: int = 2
+    tournament_size: int = 2
+
+
+@dataclass
+class IslandConfig:
+    islands: int = 4
+    migration_interval: int = 50
+    migrants: int = 5
+    topology: str = 'ring'  # 'ring' or 'complete'
+    buffer_slots: int = 32
 
 
 s = np.array(
@@ -26,7 +45,8 @@ s = np.array(
 )
 
 # sample_sudoku_instances = tools.load_instances("data/instances.json")
-instances_set = tools.load_sudoku_instances("data/new_instances_25_30_35.json")
+instances_set = tools.load_sudoku_instances(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'new_instances_25_30_35.json'))
 
 DefaultConfig: EvolutionConfig = EvolutionConfig(
     # sudoku_instance=sample_sudoku_instances['easy'][0]['puzzle'],
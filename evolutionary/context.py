@@ -0,0 +1,39 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from board import box_size
+
+
+class PuzzleContext:
+    """
+    Data derived from sudoku instance which does not change during evolution.
+    Built once per puzzle and shared by all individuals, operators and generators.
+    """
+
+    def __init__(self, sudoku_instance: np.ndarray):
+        self.sudoku_instance: np.ndarray = sudoku_instance
+        self.size: int = sudoku_instance.shape[0]
+        self.box: int = box_size(self.size)
+        self.fixed: np.ndarray = sudoku_instance > 0
+        self.starting_points: List[Tuple] = [(x, y) for x, y in zip(*np.where(self.fixed))]
+
+        # flat indexes of not fixed cells of every square, padded with -1
+        size, box = self.size, self.box
+        self.free_cells: np.ndarray = np.full((size, size), -1, dtype=np.intp)
+        self.free_counts: np.ndarray = np.zeros(size, dtype=np.intp)
+        self.free_points: List[List[Tuple]] = []
+        self.missing_numbers: List[np.ndarray] = []
+        for square in range(size):
+            xbegin, ybegin = (square // box) * box, (square % box) * box
+            points = [(x, y) for x in range(xbegin, xbegin + box) for y in range(ybegin, ybegin + box)
+                      if not self.fixed[x, y]]
+            self.free_cells[square, :len(points)] = [x * size + y for x, y in points]
+            self.free_counts[square] = len(points)
+            self.free_points.append(points)
+            square_numbers = sudoku_instance[xbegin:xbegin + box, ybegin:ybegin + box]
+            self.missing_numbers.append(np.setdiff1d(np.arange(1, size + 1), square_numbers))
+
+    def __deepcopy__(self, memo) -> 'PuzzleContext':
+        # context is read-only, cloned individuals keep sharing it
+        return self
@@ -3,9 +3,12 @@ from copy import copy
 
 import numpy as np
 
+from board import box_size, square_ranges
+from evaluation import _count_repetitions
+
 
 def swap_columns(ind1, ind2):
-    begin, end = random.choice(ranges)
+    begin, end = random.choice(square_ranges(ind1.sudoku.shape[0]))
     part1 = copy(ind1.sudoku[:, begin:end])
     part2 = copy(ind2.sudoku[:, begin:end])
     ind1.sudoku[:, begin:end], ind2.sudoku[:, begin:end] = part2, part1
@@ -13,19 +16,22 @@ def swap_columns(ind1, ind2):
 
 
 def swap_rows(ind1, ind2):
-    begin, end = random.choice(ranges)
+    begin, end = random.choice(square_ranges(ind1.sudoku.shape[0]))
     part1 = copy(ind1.sudoku[begin:end, :])
     part2 = copy(ind2.sudoku[begin:end, :])
     ind1.sudoku[begin:end, :], ind2.sudoku[begin:end, :] = part2, part1
     return ind1, ind2
 
 
-ranges = [[0, 3], [3, 6], [6, 9]]
+ranges = square_ranges(9)
 squares = [(x, y) for x in ranges for y in ranges]
 
 
 def swap_squares(ind1, ind2, n=3):
-    chosen_squares = random.sample(squares, k=n)
+    size = ind1.sudoku.shape[0]
+    size_ranges = square_ranges(size)
+    size_squares = squares if size == 9 else [(x, y) for x in size_ranges for y in size_ranges]
+    chosen_squares = random.sample(size_squares, k=n)
     for (xbegin, xend), (ybegin, yend) in chosen_squares:
         square1 = copy(ind1.sudoku[xbegin:xend, ybegin:yend])
         square2 = copy(ind2.sudoku[xbegin:xend, ybegin:yend])
@@ -38,12 +44,14 @@ def swap_using_score(ind1, ind2):
     """
     Child1 takes best rows, child2 takes best columns.
     Score -> number of unique number in column
-    3x3 subblocks are taken into consideration
+    Bands of rows and columns of squares are taken into consideration
     :param ind1:
     :param ind2:
     :return:
     """
-    child1, child2 = np.zeros((9, 9), dtype=int), np.zeros((9, 9), dtype=int)
+    size = ind1.sudoku.shape[0]
+    ranges = square_ranges(size)
+    child1, child2 = np.zeros((size, size), dtype=int), np.zeros((size, size), dtype=int)
     for sub_row in ranges:
         first_score, second_score = 0, 0
         for row in range(sub_row[0], sub_row[1]):
@@ -64,3 +72,25 @@ def swap_using_score(ind1, ind2):
 
 def calculate_score(number_list: np.array) -> int:
     return len(set(number_list))
+
+
+def swap_using_score_batch(parents1: np.ndarray, parents2: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Vectorized swap_using_score for many pairs of parents at once.
+    :param parents1: array of shape (P, size, size)
+    :param parents2: array of shape (P, size, size)
+    :return: children with best row bands and children with best column bands
+    """
+    pairs, box = parents1.shape[0], box_size(parents1.shape[-1])
+
+    band_repetitions1 = _count_repetitions(parents1).reshape(pairs, box, box).sum(axis=2)
+    band_repetitions2 = _count_repetitions(parents2).reshape(pairs, box, box).sum(axis=2)
+    take_first = np.repeat(band_repetitions1 < band_repetitions2, box, axis=1)[:, :, np.newaxis]
+    children1 = np.where(take_first, parents1, parents2)
+
+    band_repetitions1 = _count_repetitions(parents1.transpose(0, 2, 1)).reshape(pairs, box, box).sum(axis=2)
+    band_repetitions2 = _count_repetitions(parents2.transpose(0, 2, 1)).reshape(pairs, box, box).sum(axis=2)
+    take_first = np.repeat(band_repetitions1 < band_repetitions2, box, axis=1)[:, np.newaxis, :]
+    children2 = np.where(take_first, parents1, parents2)
+
+    return children1, children2
@@ -0,0 +1,91 @@
+import numpy as np
+
+from evolutionary import crossovers, mutations
+from evolutionary.context import PuzzleContext
+from evolutionary.population import PopulationArray, first_occurrences
+
+
+class GenerationEngine:
+    """
+    Runs generations of evolution on preallocated arenas: two parent buffers used alternately
+    and one offspring buffer with child_per_parent slots for every parent.
+    Crossover and mutation write into offspring slots in place, so a generation
+    does not create any per-individual objects.
+    """
+
+    def __init__(self, context: PuzzleContext, population_size: int, cxpb: float = 0.3, mxpb: float = 0.3,
+                 child_per_parent: int = 2, tournament_size: int = 2):
+        self.context: PuzzleContext = context
+        self.population_size: int = population_size
+        self.cxpb: float = cxpb
+        self.mxpb: float = mxpb
+        self.child_per_parent: int = child_per_parent
+        self.tournament_size: int = tournament_size
+
+        offspring_size = child_per_parent * population_size
+        self.parents: PopulationArray = PopulationArray.random(context, population_size)
+        self.parents.evaluate()
+        self._spare: PopulationArray = PopulationArray(context, np.empty_like(self.parents.genomes),
+                                                       np.empty_like(self.parents.fitness))
+        self.offspring: PopulationArray = PopulationArray(context, np.empty((offspring_size, context.size ** 2),
+                                                                           dtype=np.uint8))
+
+        # offspring slot i is a copy of parent i % population_size, pairs of neighbouring slots are mated
+        self._parent_of_slot: np.ndarray = np.tile(np.arange(population_size), child_per_parent)
+        self._first_of_group: np.ndarray = np.arange(0, offspring_size, child_per_parent)
+        self._tournaments: np.ndarray = np.arange(population_size)
+        self._selected: np.ndarray = np.empty(population_size, dtype=np.intp)
+
+    def step(self) -> None:
+        parents, offspring = self.parents, self.offspring
+        size = len(offspring)
+
+        np.take(parents.genomes, self._parent_of_slot, axis=0, out=offspring.genomes)
+        np.take(parents.fitness, self._parent_of_slot, out=offspring.fitness)
+
+        mated = np.flatnonzero(np.random.random(size // 2) < self.cxpb)
+        if len(mated) > 0:
+            first, second = 2 * mated, 2 * mated + 1
+            sudokus = offspring.sudokus
+            sudokus[first], sudokus[second] = crossovers.swap_using_score_batch(sudokus[first], sudokus[second])
+            offspring.invalidate(first)
+            offspring.invalidate(second)
+
+        mutated = np.flatnonzero(np.random.random(size) < self.mxpb)
+        swap_many = np.random.random(len(mutated)) < 0.8
+        mutations.random_swap_in_squares_batch(offspring.genomes, self.context, rows=mutated[swap_many])
+        mutations.random_swap_in_square_batch(offspring.genomes, self.context, rows=mutated[~swap_many])
+        offspring.invalidate(mutated)
+
+        offspring.evaluate()
+
+        # best of children of every group, then duplicates removal and tournament selection
+        best_of_groups = self._first_of_group + offspring.fitness.reshape(-1, self.child_per_parent).argmin(axis=1)
+        candidates = best_of_groups[first_occurrences(offspring.genomes[best_of_groups])]
+        aspirants = candidates[np.random.randint(0, len(candidates), (self.population_size, self.tournament_size))]
+        self._selected[:] = aspirants[self._tournaments, offspring.fitness[aspirants].argmin(axis=1)]
+
+        np.take(offspring.genomes, self._selected, axis=0, out=self._spare.genomes)
+        np.take(offspring.fitness, self._selected, out=self._spare.fitness)
+        self.parents, self._spare = self._spare, self.parents
+
+    def best_index(self) -> int:
+        return self.parents.best_index()
+
+    def elite(self, k: int) -> (np.ndarray, np.ndarray):
+        """
+        :return: copies of genomes and fitness of k best parents
+        """
+        indices = np.argsort(self.parents.fitness, kind='stable')[:k]
+        return self.parents.genomes[indices], self.parents.fitness[indices]
+
+    def immigrate(self, genomes: np.ndarray, fitness: np.ndarray) -> None:
+        """
+        Replaces worst parents with given individuals
+        """
+        k = min(len(genomes), len(self.parents))
+        if k == 0:
+            return
+        indices = np.argsort(self.parents.fitness, kind='stable')[-k:]
+        self.parents.genomes[indices] = genomes[:k]
+        self.parents.fitness[indices] = fitness[:k]
@@ -0,0 +1,160 @@
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+
+from evolutionary import algorithm, config
+from tools import Timer
+
+
+class MigrationBuffer:
+    """
+    Ring buffer of migrating individuals placed in shared memory, it is the inbox of one island.
+    Layout: int64 write counter, int32 fitness of every slot, uint8 genome of every slot.
+    Every reader keeps its own read counter, slots overwritten before being read are lost.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, slots: int, genome_size: int, lock):
+        self.memory = memory
+        self.slots = slots
+        self.lock = lock
+        self._counter = np.ndarray((1,), dtype=np.int64, buffer=memory.buf, offset=0)
+        self._fitness = np.ndarray((slots,), dtype=np.int32, buffer=memory.buf, offset=8)
+        self._genomes = np.ndarray((slots, genome_size), dtype=np.uint8, buffer=memory.buf, offset=8 + 4 * slots)
+
+    @staticmethod
+    def size(slots: int, genome_size: int) -> int:
+        return 8 + slots * (4 + genome_size)
+
+    @classmethod
+    def create(cls, slots: int, genome_size: int, lock) -> 'MigrationBuffer':
+        memory = shared_memory.SharedMemory(create=True, size=cls.size(slots, genome_size))
+        buffer = cls(memory, slots, genome_size, lock)
+        buffer._counter[0] = 0
+        return buffer
+
+    @classmethod
+    def attach(cls, name: str, slots: int, genome_size: int, lock) -> 'MigrationBuffer':
+        return cls(shared_memory.SharedMemory(name=name), slots, genome_size, lock)
+
+    def put(self, genomes: np.ndarray, fitness: np.ndarray) -> None:
+        with self.lock:
+            counter = int(self._counter[0])
+            slots = (counter + np.arange(len(genomes))) % self.slots
+            self._genomes[slots] = genomes
+            self._fitness[slots] = fitness
+            self._counter[0] = counter + len(genomes)
+
+    def get(self, read_counter: int) -> (np.ndarray, np.ndarray, int):
+        """
+        :param read_counter: number of individuals already read by the caller
+        :return: genomes and fitness of individuals written since then, new read counter
+        """
+        with self.lock:
+            counter = int(self._counter[0])
+            first = max(read_counter, counter - self.slots)
+            slots = np.arange(first, counter) % self.slots
+            return self._genomes[slots], self._fitness[slots], counter
+
+    def close(self) -> None:
+        del self._counter, self._fitness, self._genomes
+        self.memory.close()
+
+
+def neighbours(island: int, islands: int, topology: str) -> List[int]:
+    if islands < 2:
+        return []
+    if topology == 'ring':
+        return [(island + 1) % islands]
+    if topology == 'complete':
+        return [other for other in range(islands) if other != island]
+    raise ValueError(f'unknown topology: {topology}')
+
+
+def _island(island: int, cfg: config.EvolutionConfig, island_cfg: config.IslandConfig,
+            inbox_names: List[str], locks: List, solved, results) -> None:
+    np.random.seed()  # forked islands would otherwise share random state
+    genome_size = cfg.sudoku_instance.size
+    inboxes = [MigrationBuffer.attach(name, island_cfg.buffer_slots, genome_size, lock)
+               for name, lock in zip(inbox_names, locks)]
+    targets = [inboxes[other] for other in neighbours(island, island_cfg.islands, island_cfg.topology)]
+    inbox = inboxes[island]
+
+    engine = algorithm.create_engine(cfg)
+    read_counter = 0
+    i = 0
+    try:
+        while cfg.max_iterations > i and not solved.is_set():
+            i += 1
+            engine.step()
+            if engine.parents.fitness[engine.best_index()] == 0:
+                solved.set()
+                break
+            if i % island_cfg.migration_interval == 0:
+                genomes, fitness, read_counter = inbox.get(read_counter)
+                engine.immigrate(genomes, fitness)
+                genomes, fitness = engine.elite(island_cfg.migrants)
+                for target in targets:
+                    target.put(genomes, fitness)
+        best = engine.best_index()
+        results.put((island, int(engine.parents.fitness[best]), engine.parents.genomes[best].copy(), i))
+    finally:
+        for buffer in inboxes:
+            buffer.close()
+
+
+def run(cfg: config.EvolutionConfig, island_cfg: config.IslandConfig):
+    """
+    Island model: island_cfg.islands subpopulations evolve in separate processes
+    and periodically send their elite to neighbouring islands through shared memory.
+    All islands stop as soon as any of them finds a solution.
+    :return: best sudoku found and its fitness
+    :raises RuntimeError: if every island stopped without reporting its result
+    """
+    neighbours(0, island_cfg.islands, island_cfg.topology)  # unknown topology fails here, not in every island
+    locks = [mp.Lock() for _ in range(island_cfg.islands)]
+    inboxes = [MigrationBuffer.create(island_cfg.buffer_slots, cfg.sudoku_instance.size, lock) for lock in locks]
+    solved = mp.Event()
+    results = mp.Queue()
+    processes = [mp.Process(target=_island, args=(island, cfg, island_cfg, [inbox.memory.name for inbox in inboxes],
+                                                  locks, solved, results))
+                 for island in range(island_cfg.islands)]
+
+    island_results = []
+    with Timer() as timer:
+        try:
+            for process in processes:
+                process.start()
+            while len(island_results) < len(processes):
+                try:
+                    island_results.append(results.get(timeout=1))
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break
+            for process in processes:
+                process.join()
+            # islands which put their result and exited just after the last get
+            while True:
+                try:
+                    island_results.append(results.get_nowait())
+                except queue.Empty:
+                    break
+        finally:
+            for inbox in inboxes:
+                inbox.close()
+                inbox.memory.unlink()
+
+    if len(island_results) == 0:
+        raise RuntimeError('no island reported its result, exit codes: {}'.format(
+            [process.exitcode for process in processes]))
+    island, fitness, genome, generations = min(island_results, key=lambda result: result[1])
+    print(f'island {island} finished with fitness {fitness} after {generations} generations, {timer.elapsed}s')
+    sudoku = genome.reshape(cfg.sudoku_instance.shape).astype(int)
+    print(sudoku)
+    return sudoku, fitness
+
+
+if __name__ == '__main__':
+    run(config.DefaultConfig, config.IslandConfig())
@@ -1,70 +1,98 @@
 import random
 import numpy as np
 
-ranges = [[0, 3], [3, 6], [6, 9]]
+from evolutionary.context import PuzzleContext
 
 
 def random_9_square(ind):
     """
-    With given probability generates random 3x3 square with 1-9 numbers
+    With given probability generates random square with 1-size numbers
     :param ind: individual to be mutated
-    Algorithm is checking which fields are set at the beginning of sudoku and then applies numbers for rest of fields.
+    Numbers missing in square are permuted over its not fixed fields, fixed fields are never touched.
+    Fitness of mutated individual has to be deleted by the caller.
     """
     prob = 10
-    ranges = [[0, 3], [3, 6], [6, 9]]
-    for xbegin, xend in ranges:
-        for ybegin, yend in ranges:
-            if prob > random.randint(1, 100):
-                available_numbers = set(range(1, 10))
-                static_points = []
-                for x, y in ind.starting_points:
-                    if xbegin <= x < xend and ybegin <= y < yend:
-                        static_points.append((x, y))
-                        available_numbers.remove(ind.sudoku_instance[x, y])
-                random_numbers = list(np.random.permutation(list(available_numbers)))
-                for x in range(xbegin, xend):
-                    for y in range(ybegin, yend):
-                        if (x, y) not in static_points:
-                            ind.sudoku[x, y] = random_numbers.pop()
-                        else:
-                            ind.sudoku[x, y] = ind.sudoku_instance[x, y]
+    context = ind.context
+    for square in range(context.size):
+        if prob > random.randint(1, 100):
+            cells = context.free_cells[square, :context.free_counts[square]]
+            ind.sudoku.flat[cells] = np.random.permutation(context.missing_numbers[square])
 
 
 def random_swap_in_squares(ind):
     """
     With given probability take 2 numbers in square and swap their positions.
+    Fitness is kept up to date, see swap_points.
     """
     prob = 30
-    ranges = [[0, 3], [3, 6], [6, 9]]
-    for xbegin, xend in ranges:
-        for ybegin, yend in ranges:
-            if prob > random.randint(1, 100):
-                available_points = [(x, y) for x in range(xbegin, xend) for y in range(ybegin, yend)]
-                for x, y in ind.starting_points:
-                    if xbegin <= x < xend and ybegin <= y < yend:
-                        available_points.remove((x, y))
-                if len(available_points) < 2:
-                    continue
-                points_to_swap = random.sample(available_points, k=2)
-                x1, y1 = points_to_swap[0]
-                x2, y2 = points_to_swap[1]
-                ind.sudoku[x1, y1], ind.sudoku[x2, y2] = ind.sudoku[x2, y2], ind.sudoku[x1, y1]
+    for available_points in ind.context.free_points:
+        if prob > random.randint(1, 100):
+            if len(available_points) < 2:
+                continue
+            points_to_swap = random.sample(available_points, k=2)
+            swap_points(ind, *points_to_swap[0], *points_to_swap[1])
 
 
 def random_swap_in_square(ind):
     """
-    With given probability take 2 numbers in square and swap their positions.
+    Take 2 numbers in randomly chosen square and swap their positions.
+    Fitness is kept up to date, see swap_points.
     """
-    ranges = [[0, 3], [3, 6], [6, 9]]
-    xbegin, xend = random.choice(ranges)
-    ybegin, yend = random.choice(ranges)
-    available_points = [(x, y) for x in range(xbegin, xend) for y in range(ybegin, yend)]
-    for x, y in ind.starting_points:
-        if xbegin <= x < xend and ybegin <= y < yend:
-            available_points.remove((x, y))
+    available_points = random.choice(ind.context.free_points)
     if len(available_points) < 2:
         return
     points_to_swap = random.sample(available_points, k=2)
-    x1, y1 = points_to_swap[0]
-    x2, y2 = points_to_swap[1]
-    ind.sudoku[x1, y1], ind.sudoku[x2, y2] = ind.sudoku[x2, y2], ind.sudoku[x1, y1]
\ No newline at end of file
+    swap_points(ind, *points_to_swap[0], *points_to_swap[1])
+
+
+def swap_points(ind, x1, y1, x2, y2):
+    """
+    Swaps two cells of the same square.
+    If individual has valid fitness, it is updated incrementally from digit-count tables,
+    otherwise only the sudoku is changed and individual waits for full evaluation.
+    """
+    if ind.fitness.valid:
+        delta = ind.swap_in_square(x1, y1, x2, y2)
+        ind.fitness.values = (ind.fitness.values[0] + delta,)
+    else:
+        ind.sudoku[x1, y1], ind.sudoku[x2, y2] = ind.sudoku[x2, y2], ind.sudoku[x1, y1]
+
+
+def random_swap_in_squares_batch(genomes: np.ndarray, context: PuzzleContext, rows: np.ndarray = None,
+                                 prob: float = 0.3) -> None:
+    """
+    Vectorized random_swap_in_squares, mutates flattened sudokus in place.
+    :param genomes: array of shape (N, size * size) with individuals to be mutated
+    :param context: context of solved instance
+    :param rows: indices of individuals to be mutated, all individuals if not given
+    :param prob: probability of swapping two cells in a single square
+    """
+    if rows is None:
+        rows = np.arange(genomes.shape[0])
+    for square, count in enumerate(context.free_counts):
+        if count < 2:
+            continue
+        chosen_rows = rows[np.random.random(rows.shape[0]) < prob]
+        _swap_cells(genomes, chosen_rows, np.full(chosen_rows.shape[0], square), context)
+
+
+def random_swap_in_square_batch(genomes: np.ndarray, context: PuzzleContext, rows: np.ndarray = None) -> None:
+    """
+    Vectorized random_swap_in_square, mutates flattened sudokus in place.
+    Arguments are the same as for random_swap_in_squares_batch.
+    """
+    if rows is None:
+        rows = np.arange(genomes.shape[0])
+    squares = np.random.randint(0, context.size, rows.shape[0])
+    swappable = context.free_counts[squares] >= 2
+    _swap_cells(genomes, rows[swappable], squares[swappable], context)
+
+
+def _swap_cells(genomes, rows, squares, context):
+    counts = context.free_counts[squares]
+    first = (np.random.random(rows.shape[0]) * counts).astype(int)
+    second = (first + 1 + (np.random.random(rows.shape[0]) * (counts - 1)).astype(int)) % counts
+    first_cells, second_cells = context.free_cells[squares, first], context.free_cells[squares, second]
+    first_values = genomes[rows, first_cells]
+    genomes[rows, first_cells] = genomes[rows, second_cells]
+    genomes[rows, second_cells] = first_values
@@ -0,0 +1,86 @@
+from typing import List
+
+import numpy as np
+
+from evaluation import validate_population
+from evolutionary.chromosome import generate_random_sudoku_instances_with_square_constraints
+from evolutionary.context import PuzzleContext
+
+
+class PopulationArray:
+    """
+    Population kept as one contiguous (N, size * size) genome buffer and a fitness vector
+    instead of a list of Chromosome objects. Puzzle is shared by all individuals.
+    Negative fitness marks individuals which have to be evaluated.
+    """
+    INVALID = -1
+
+    def __init__(self, context: PuzzleContext, genomes: np.ndarray, fitness: np.ndarray = None):
+        self.context: PuzzleContext = context
+        self.genomes: np.ndarray = genomes
+        self.fitness: np.ndarray = fitness if fitness is not None else np.full(len(genomes), self.INVALID,
+                                                                               dtype=np.int32)
+
+    @classmethod
+    def random(cls, context: PuzzleContext, size: int) -> 'PopulationArray':
+        sudokus = generate_random_sudoku_instances_with_square_constraints(context, size, dtype=np.uint8)
+        return cls(context, sudokus.reshape(size, -1))
+
+    @classmethod
+    def from_individuals(cls, individuals: List) -> 'PopulationArray':
+        genomes = np.stack([ind.sudoku.flatten() for ind in individuals]).astype(np.uint8)
+        fitness = np.array([ind.fitness.values[0] if ind.fitness.valid else cls.INVALID for ind in individuals],
+                           dtype=np.int32)
+        return cls(individuals[0].context, genomes, fitness)
+
+    def __len__(self) -> int:
+        return len(self.genomes)
+
+    @property
+    def sudokus(self) -> np.ndarray:
+        """
+        :return: view of genomes as array of shape (N, size, size)
+        """
+        return self.genomes.reshape(-1, self.context.size, self.context.size)
+
+    def invalidate(self, indices) -> None:
+        self.fitness[indices] = self.INVALID
+
+    def evaluate(self) -> None:
+        invalid = np.flatnonzero(self.fitness < 0)
+        if len(invalid) > 0:
+            self.fitness[invalid] = validate_population(self.sudokus[invalid])
+
+    def take(self, indices) -> 'PopulationArray':
+        """
+        Selection and cloning in one step
+        :param indices: indices of individuals to be copied into new population, repetitions are allowed
+        """
+        return PopulationArray(self.context, self.genomes[indices], self.fitness[indices])
+
+    def unique(self) -> 'PopulationArray':
+        """
+        :return: population without duplicated genomes, first occurrences are kept in original order
+        """
+        return self.take(first_occurrences(self.genomes))
+
+    def select_tournament(self, k: int, tournsize: int) -> 'PopulationArray':
+        """
+        Array counterpart of deap.tools.selTournament for minimized fitness
+        """
+        aspirants = np.random.randint(0, len(self), (k, tournsize))
+        winners = aspirants[np.arange(k), self.fitness[aspirants].argmin(axis=1)]
+        return self.take(winners)
+
+    def best_index(self) -> int:
+        return int(self.fitness.argmin())
+
+
+def first_occurrences(genomes: np.ndarray) -> np.ndarray:
+    """
+    :param genomes: array of shape (N, size * size)
+    :return: sorted indices of first occurrences of every distinct genome
+    """
+    keys = np.ascontiguousarray(genomes).view(np.dtype((np.void, genomes.shape[1]))).ravel()
+    _, indices = np.unique(keys, return_index=True)
+    return np.sort(indices)
@@ -0,0 +1,176 @@
+import multiprocessing as mp
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from evaluation import _validate, validate_chromosomes, validate_population
+from evolutionary import algorithm, chromosome, config, crossovers, islands, mutations
+from evolutionary.context import PuzzleContext
+from evolutionary.engine import GenerationEngine
+from evolutionary.population import PopulationArray
+
+
+def _silent_island(*args):
+    pass  # island which exits without reporting its result
+
+
+class EvolutionaryTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.toolbox = algorithm.create_toolbox(config.DefaultConfig)
+        self.population = self.toolbox.population(n=20)
+        for ind, fit in zip(self.population, validate_chromosomes(self.population)):
+            ind.fitness.values = fit
+
+    def test_swap_mutations_keep_fitness_up_to_date(self):
+        for _ in range(50):
+            for ind in self.population:
+                mutations.random_swap_in_squares(ind)
+                mutations.random_swap_in_square(ind)
+                self.assertTrue(ind.fitness.valid)
+                self.assertEqual(ind.fitness.values[0], _validate(ind.sudoku))
+
+    def test_swap_mutations_keep_starting_points(self):
+        instance = config.DefaultConfig.sudoku_instance
+        for ind in self.population:
+            for _ in range(50):
+                mutations.random_swap_in_squares(ind)
+            fixed = instance > 0
+            self.assertTrue(np.array_equal(ind.sudoku[fixed], instance[fixed]))
+
+    def test_batch_generation_keeps_square_constraints(self):
+        context = PuzzleContext(config.DefaultConfig.sudoku_instance)
+        sudokus = chromosome.generate_random_sudoku_instances_with_square_constraints(context, 100)
+        squares = sudokus.reshape(-1, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(-1, 9, 9)
+        self.assertTrue((np.sort(squares, axis=2) == np.arange(1, 10)).all())
+        self.assertTrue((sudokus[:, context.fixed] == context.sudoku_instance[context.fixed]).all())
+
+    def test_prefill_fixes_deduced_cells(self):
+        cfg = config.EvolutionConfig(**{**config.DefaultConfig.__dict__, 'prefill': True})
+        context = algorithm.create_context(cfg)
+        instance = cfg.sudoku_instance
+        self.assertTrue((context.sudoku_instance[instance > 0] == instance[instance > 0]).all())
+        self.assertGreater(np.count_nonzero(context.fixed), np.count_nonzero(instance))
+
+    def test_context_is_shared_by_clones(self):
+        clone = self.toolbox.clone(self.population[0])
+        self.assertIs(clone.context, self.population[0].context)
+        mutations.random_9_square(clone)
+        self.assertFalse(clone.sudoku is self.population[0].sudoku)
+
+    def test_batch_crossover_matches_single(self):
+        parents1, parents2 = self.population[::2], self.population[1::2]
+        children1, children2 = crossovers.swap_using_score_batch(np.stack([ind.sudoku for ind in parents1]),
+                                                                 np.stack([ind.sudoku for ind in parents2]))
+        for ind1, ind2, child1, child2 in zip(parents1, parents2, children1, children2):
+            crossovers.swap_using_score(ind1, ind2)
+            self.assertTrue(np.array_equal(ind1.sudoku, child1))
+            self.assertTrue(np.array_equal(ind2.sudoku, child2))
+
+    def test_batch_swap_mutations_keep_squares(self):
+        instance = config.DefaultConfig.sudoku_instance
+        context = PuzzleContext(instance)
+        population = PopulationArray.from_individuals(self.population)
+        genomes = population.genomes.copy()
+        for _ in range(20):
+            mutations.random_swap_in_squares_batch(genomes, context)
+            mutations.random_swap_in_square_batch(genomes, context)
+        squares = lambda g: np.sort(g.reshape(-1, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(-1, 9, 9), axis=2)
+        self.assertTrue(np.array_equal(squares(genomes), squares(population.genomes)))
+        fixed = instance.flatten() > 0
+        self.assertTrue(np.array_equal(genomes[:, fixed], population.genomes[:, fixed]))
+
+    def test_choose_unique_keeps_first_occurrences(self):
+        population = [self.population[i] for i in [3, 1, 3, 0, 1, 2]]
+        copies = [self.toolbox.clone(ind) for ind in population]
+        copies[2].sudoku = copies[2].sudoku.astype(np.int32)  # equal values of another dtype are duplicates too
+        expected = [copies[i] for i in [0, 1, 3, 5]]
+        self.assertEqual([id(ind) for ind in algorithm.choose_unique(copies)], [id(ind) for ind in expected])
+
+    def test_population_unique_keeps_first_occurrences(self):
+        population = PopulationArray.from_individuals(self.population)
+        duplicated = population.take([3, 1, 3, 0, 1, 2])
+        self.assertTrue(np.array_equal(duplicated.unique().genomes, population.genomes[[3, 1, 0, 2]]))
+
+    def test_engine_keeps_fitness_and_starting_points(self):
+        context = PuzzleContext(config.DefaultConfig.sudoku_instance)
+        engine = GenerationEngine(context, 50)
+        for _ in range(30):
+            engine.step()
+            parents = engine.parents
+            self.assertEqual(parents.fitness.tolist(), validate_population(parents.sudokus).tolist())
+            self.assertTrue((parents.sudokus[:, context.fixed] == context.sudoku_instance[context.fixed]).all())
+
+    def test_engine_takes_operator_parameters_from_config(self):
+        cfg = config.EvolutionConfig(**{**config.DefaultConfig.__dict__, 'population_size': 10,
+                                        'crossover_probability': 0.5, 'mutation_probability': 0.1,
+                                        'child_per_parent': 3, 'tournament_size': 4})
+        engine = algorithm.create_engine(cfg)
+        self.assertEqual((engine.cxpb, engine.mxpb, engine.child_per_parent, engine.tournament_size), (0.5, 0.1, 3, 4))
+
+    def test_engine_on_16x16_puzzle(self):
+        rows, cols = np.indices((16, 16))
+        solution = (4 * (rows % 4) + rows // 4 + cols) % 16 + 1
+        context = PuzzleContext(np.where(np.random.RandomState(0).rand(16, 16) < 0.5, solution, 0))
+        engine = GenerationEngine(context, 20)
+        for _ in range(5):
+            engine.step()
+        parents = engine.parents
+        self.assertEqual(parents.sudokus.shape, (20, 16, 16))
+        self.assertEqual(parents.fitness.tolist(), validate_population(parents.sudokus).tolist())
+        self.assertTrue((parents.sudokus[:, context.fixed] == context.sudoku_instance[context.fixed]).all())
+
+    def test_migration_buffer_wraps_around_and_tracks_readers(self):
+        buffer = islands.MigrationBuffer.create(slots=4, genome_size=2, lock=mp.Lock())
+        try:
+            buffer.put(np.array([[1, 1], [2, 2], [3, 3]]), np.array([1, 2, 3]))
+            genomes, fitness, read_counter = buffer.get(0)
+            self.assertEqual(genomes.tolist(), [[1, 1], [2, 2], [3, 3]])
+            self.assertEqual((fitness.tolist(), read_counter), ([1, 2, 3], 3))
+            self.assertEqual(len(buffer.get(read_counter)[0]), 0)
+
+            buffer.put(np.array([[4, 4], [5, 5], [6, 6]]), np.array([4, 5, 6]))
+            genomes, fitness, read_counter = buffer.get(read_counter)
+            self.assertEqual((fitness.tolist(), read_counter), ([4, 5, 6], 6))
+            # slots overwritten before being read are lost
+            genomes, fitness, _ = buffer.get(0)
+            self.assertEqual((genomes[:, 0].tolist(), fitness.tolist()), ([3, 4, 5, 6], [3, 4, 5, 6]))
+        finally:
+            buffer.close()
+            buffer.memory.unlink()
+
+    def test_island_neighbours(self):
+        self.assertEqual([islands.neighbours(island, 3, 'ring') for island in range(3)], [[1], [2], [0]])
+        self.assertEqual([islands.neighbours(island, 3, 'complete') for island in range(3)],
+                         [[1, 2], [0, 2], [0, 1]])
+        self.assertEqual(islands.neighbours(0, 1, 'ring'), [])
+        with self.assertRaises(ValueError):
+            islands.neighbours(0, 2, 'star')
+
+    def test_two_islands_return_valid_individual(self):
+        cfg = config.EvolutionConfig(**{**config.DefaultConfig.__dict__, 'max_iterations': 30, 'population_size': 20})
+        island_cfg = config.IslandConfig(islands=2, migration_interval=5, migrants=2, topology='complete')
+        sudoku, fitness = islands.run(cfg, island_cfg)
+        instance = cfg.sudoku_instance
+        squares = sudoku.reshape(3, 3, 3, 3).transpose(0, 2, 1, 3).reshape(9, 9)
+        self.assertTrue((np.sort(squares, axis=1) == np.arange(1, 10)).all())
+        self.assertTrue((sudoku[instance > 0] == instance[instance > 0]).all())
+        self.assertEqual(fitness, _validate(sudoku))
+        self.assertEqual(mp.active_children(), [])
+
+    def test_islands_without_results_raise(self):
+        cfg = config.EvolutionConfig(**{**config.DefaultConfig.__dict__, 'max_iterations': 5, 'population_size': 10})
+        with mock.patch.object(islands, '_island', _silent_island):
+            with self.assertRaisesRegex(RuntimeError, 'no island reported'):
+                islands.run(cfg, config.IslandConfig(islands=2))
+
+    def test_islands_reject_unknown_topology_before_start(self):
+        with mock.patch.object(islands.mp, 'Process') as process:
+            with self.assertRaises(ValueError):
+                islands.run(config.DefaultConfig, config.IslandConfig(islands=2, topology='star'))
+        process.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import argparse
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+import instance_store
+from dfs import bitboard, propagation
+
+# tiers of the dataset and their clue counts
+DefaultTiers = {
+    'easy40': 40,
+    'medium35': 35,
+    'advanced30': 30,
+    'hard25': 25,
+}
+
+CSV_HEADER = 'id,puzzle,solution,clues,difficulty,level'
+
+
+def random_solution(rng: np.random.RandomState) -> np.ndarray:
+    """
+    Fills diagonal squares (which do not constrain each other) with random permutations, completes the grid
+    with bitboard DFS and shuffles it with transformations which keep it valid
+    :return: random solved sudoku of shape (9, 9)
+    """
+    grid = np.zeros((9, 9), dtype=int)
+    for square in range(3):
+        grid[square * 3:square * 3 + 3, square * 3:square * 3 + 3] = rng.permutation(9).reshape(3, 3) + 1
+    grid = bitboard.solve(grid)
+
+    relabel = np.concatenate([[0], rng.permutation(9) + 1])
+    rows = np.concatenate([band * 3 + rng.permutation(3) for band in rng.permutation(3)])
+    columns = np.concatenate([stack * 3 + rng.permutation(3) for stack in rng.permutation(3)])
+    grid = relabel[grid[rows][:, columns]]
+    return grid.T if rng.randint(2) else grid
+
+
+def dig(solution: np.ndarray, clues: int, rng: np.random.RandomState) -> np.ndarray:
+    """
+    Removes cells of solution in random order as long as puzzle keeps a unique solution
+    :return: puzzle with exactly given amount of clues, None if digging got stuck above it
+    """
+    puzzle = np.copy(solution)
+    remaining = puzzle.size
+    for cell in rng.permutation(puzzle.size):
+        if remaining == clues:
+            return puzzle
+        row, col = divmod(int(cell), 9)
+        puzzle[row, col] = 0
+        count, _ = bitboard.count_solutions(puzzle, limit=2)
+        if count == 1:
+            remaining -= 1
+        else:
+            puzzle[row, col] = solution[row, col]
+    return puzzle if remaining == clues else None
+
+
+def rate(puzzle: np.ndarray) -> int:
+    """
+    :return: amount of empty cells which can not be deduced with singles and locked candidates, 0 for puzzles
+    solvable without guessing
+    """
+    return int(np.count_nonzero(propagation.propagate(puzzle).grid == 0))
+
+
+def generate_puzzle(clues: int, seed: int = None, max_attempts: int = 100) -> dict:
+    """
+    :return: instance with unique solution, in format of dataset files
+    """
+    rng = np.random.RandomState(seed)
+    for _ in range(max_attempts):
+        solution = random_solution(rng)
+        puzzle = dig(solution, clues, rng)
+        if puzzle is not None:
+            return {'puzzle': puzzle, 'solution': solution, 'clues': clues, 'difficulty': rate(puzzle)}
+    raise RuntimeError(f'could not generate puzzle with {clues} clues in {max_attempts} attempts')
+
+
+def _worker(task: tuple) -> dict:
+    level, clues, seed = task
+    instance = generate_puzzle(clues, seed)
+    instance['level'] = level
+    return instance
+
+
+def generate(amount: int, tiers: dict = None, seed: int = 0, processes: int = None, chunksize: int = 16):
+    """
+    Generates puzzles of every tier in worker processes, results are yielded as soon as they are ready
+    in deterministic order, so memory use does not depend on amount
+    :param amount: amount of puzzles of every tier
+    :param tiers: {level name: clues}, DefaultTiers if not given
+    :param seed: base seed, i-th puzzle uses seed + i
+    :return: generator of instances with 'id', 'puzzle', 'solution', 'clues', 'difficulty' and 'level'
+    """
+    tiers = DefaultTiers if tiers is None else tiers
+    tasks = ((level, clues, seed + i * len(tiers) + j)
+             for i in range(amount) for j, (level, clues) in enumerate(tiers.items()))
+    with Pool(processes) as pool:
+        for i, instance in enumerate(pool.imap(_worker, tasks, chunksize=chunksize)):
+            instance['id'] = i
+            yield instance
+
+
+def to_csv_line(instance: dict) -> str:
+    """
+    :return: instance in the line format of the 3 million puzzles Kaggle set, '.' marks empty cell
+    """
+    puzzle = ''.join(map(str, instance['puzzle'].flatten())).replace('0', '.')
+    solution = ''.join(map(str, instance['solution'].flatten()))
+    return f"{instance['id']},{puzzle},{solution},{instance['clues']},{instance['difficulty']},{instance['level']}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates puzzles with unique solution and given amount of clues')
+    parser.add_argument('amount', type=int, help='amount of puzzles of every tier')
+    parser.add_argument('-o', '--output', help='output csv file or instance store if it ends with .sudokus, '
+                                               'default: standard output')
+    parser.add_argument('-c', '--clues', type=int, nargs='+', default=list(DefaultTiers.values()),
+                        help='clue counts of tiers, default: 40 35 30 25')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-p', '--processes', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+
+    names = {clues: level for level, clues in DefaultTiers.items()}
+    tiers = {names.get(clues, f'clues{clues}'): clues for clues in args.clues}
+    instances = generate(args.amount, tiers, args.seed, args.processes)
+    if args.output is not None and args.output.endswith('.sudokus'):
+        instance_store.write(args.output, instances)
+    else:
+        output = sys.stdout if args.output is None else open(args.output, 'w')
+        try:
+            print(CSV_HEADER, file=output)
+            for instance in instances:
+                print(to_csv_line(instance), file=output)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,21 @@
+import unittest
+
+import numpy as np
+
+import generator
+from dfs import bitboard
+
+
+class GeneratorTestCase(unittest.TestCase):
+
+    def test_generated_puzzles_have_unique_solution(self):
+        for clues in generator.DefaultTiers.values():
+            instance = generator.generate_puzzle(clues, seed=clues)
+            self.assertEqual(np.count_nonzero(instance['puzzle']), clues)
+            count, solution = bitboard.count_solutions(instance['puzzle'])
+            self.assertEqual(count, 1)
+            self.assertTrue(np.array_equal(solution, instance['solution']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import struct
+from typing import Iterable, List
+
+import numpy as np
+
+MAGIC = b'SUDOKUDB'
+VERSION = 1
+# magic, version, count, length of metadata
+HEADER = struct.Struct('<8sIQI')
+ALIGNMENT = 64
+
+# columns of store in order of their sections in file, puzzles and solutions take 81 bytes per instance
+COLUMNS = [
+    ('puzzles', np.uint8, (81,)),
+    ('solutions', np.uint8, (81,)),
+    ('ids', np.int64, ()),
+    ('hashes', np.int64, ()),  # signed, hashes of existing datasets are python hash() values
+    ('clues', np.uint8, ()),
+    ('tiers', np.uint8, ()),
+    ('difficulty', np.float32, ()),
+    # index for lookups by hash, sorted hashes and indexes of their instances
+    ('sorted_hashes', np.int64, ()),
+    ('hash_order', np.int64, ()),
+]
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class InstanceStore:
+    """
+    Read-only view of packed instance file, every column is np.memmap, so opening does not depend on
+    amount of instances and processes opening the same file share its pages.
+    File starts with a header and json metadata (tier names and offsets of sections), sections follow
+    aligned to 64 bytes.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        with open(path, 'rb') as file:
+            magic, version, self.count, metadata_length = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not an instance store')
+            if version != VERSION:
+                raise ValueError(f'{path} has unsupported version {version}')
+            metadata = json.loads(file.read(metadata_length).decode())
+        self.tier_names: List[str] = metadata['tiers']
+        for name, dtype, shape in COLUMNS:
+            column = np.memmap(path, dtype=dtype, mode='r', offset=metadata['offsets'][name],
+                               shape=(self.count,) + shape) if self.count > 0 else np.empty((0,) + shape, dtype)
+            setattr(self, name, column)
+
+    def __reduce__(self):
+        # workers reopen the file instead of receiving its content
+        return InstanceStore, (self.path,)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> dict:
+        """
+        :return: instance in format of tools.load_instances
+        """
+        solution = self.solutions[index]
+        return {
+            'puzzle': np.array(self.puzzles[index], dtype=int).reshape(9, 9),
+            'solution': np.array(solution, dtype=int).reshape(9, 9) if solution.any() else None,
+            'clues': int(self.clues[index]),
+            'id': int(self.ids[index]),
+            'hash': int(self.hashes[index]),
+            'difficulty': float(self.difficulty[index]),
+            'level': self.tier_names[self.tiers[index]],
+        }
+
+    def select(self, tier: str = None, clues: int = None) -> np.ndarray:
+        """
+        :return: indexes of instances of given tier and amount of clues
+        """
+        mask = np.ones(self.count, dtype=bool)
+        if tier is not None:
+            mask &= self.tiers == self.tier_names.index(tier)
+        if clues is not None:
+            mask &= self.clues == clues
+        return np.flatnonzero(mask)
+
+    def find(self, hash: int) -> int:
+        """
+        :return: index of instance with given hash, None if there is none
+        """
+        position = np.searchsorted(self.sorted_hashes, hash)
+        if position < self.count and self.sorted_hashes[position] == hash:
+            return int(self.hash_order[position])
+        return None
+
+    def to_dataset(self) -> dict:
+        """
+        :return: instances grouped by tier, like result of tools.load_instances
+        """
+        return {tier: [self[index] for index in self.select(tier=tier)] for tier in self.tier_names}
+
+
+def write(path: str, instances: Iterable[dict]) -> int:
+    """
+    Packs instances into store file, instances are consumed one by one and kept as packed bytes only
+    :param instances: dicts with 'puzzle' and optionally 'solution', 'id', 'hash', 'clues', 'difficulty'
+    and 'level'
+    :return: amount of written instances
+    """
+    buffers = {name: bytearray() for name, _, _ in COLUMNS[:-2]}
+    tier_names = []
+    count = 0
+    for count, instance in enumerate(instances, start=1):
+        puzzle = np.asarray(instance['puzzle'], dtype=np.uint8).flatten()
+        solution = instance.get('solution')
+        solution = np.zeros(81, dtype=np.uint8) if solution is None else np.asarray(solution, dtype=np.uint8)
+        level = str(instance.get('level', ''))
+        if level not in tier_names:
+            tier_names.append(level)
+        values = {
+            'puzzles': puzzle,
+            'solutions': solution.flatten(),
+            'ids': instance.get('id', count - 1),
+            'hashes': instance.get('hash', 0),
+            'clues': instance.get('clues', np.count_nonzero(puzzle)),
+            'tiers': tier_names.index(level),
+            'difficulty': instance.get('difficulty', np.nan),
+        }
+        for name, dtype, _ in COLUMNS[:-2]:
+            buffers[name] += np.asarray(values[name], dtype=dtype).tobytes()
+
+    hashes = np.frombuffer(bytes(buffers['hashes']), dtype=np.int64)
+    order = np.argsort(hashes, kind='stable').astype(np.int64)
+    buffers['sorted_hashes'] = hashes[order].tobytes()
+    buffers['hash_order'] = order.tobytes()
+
+    # offsets depend on metadata length, which depends on offsets, space for them is reserved up front
+    offsets = {name: 0 for name, _, _ in COLUMNS}
+    metadata_length = len(json.dumps({'tiers': tier_names, 'offsets': offsets}).encode()) + 32 * len(COLUMNS)
+    offset = _align(HEADER.size + metadata_length)
+    for name, _, _ in COLUMNS:
+        offsets[name] = offset
+        offset = _align(offset + len(buffers[name]))
+    metadata = json.dumps({'tiers': tier_names, 'offsets': offsets}).encode().ljust(metadata_length)
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, count, metadata_length))
+        file.write(metadata)
+        for name, _, _ in COLUMNS:
+            file.seek(offsets[name])
+            file.write(buffers[name])
+        file.truncate(offset)
+    return count
+
+
+def _json_instances(dataset: dict):
+    for level, instances in dataset.items():
+        for instance in instances:
+            yield {
+                'puzzle': instance['puzzle'],
+                'solution': instance.get('solution'),
+                'id': int(instance['id']),
+                'hash': int(instance.get('hash', 0)),  # older files have no hash
+                'clues': int(instance['clues']),
+                'difficulty': float(instance.get('difficulty', np.nan)),
+                'level': level,
+            }
+
+
+def convert(json_path: str, store_path: str) -> int:
+    """
+    Converts dataset file in json format ({level: [instances]}) into store file
+    :return: amount of converted instances
+    """
+    with open(json_path) as file:
+        dataset = json.load(file)
+    return write(store_path, _json_instances(dataset))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converts json dataset file into packed instance store')
+    parser.add_argument('input', help='dataset file, e.g. data/new_instances_25_30_35_40.json')
+    parser.add_argument('-o', '--output', help='store file, default: <input>.sudokus')
+    args = parser.parse_args()
+
+    output = args.output or '{}.sudokus'.format(os.path.splitext(args.input)[0])
+    print(f'{convert(args.input, output)} instances written to {output}')
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import instance_store
+import tools
+
+
+class InstanceStoreTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        instances = tools.load_instances('data/new_instances_25_30_35_40.json')
+        self.puzzles = [instance['puzzle'] for level in instances.values() for instance in level[:10]]
+
+    def test_instance_store_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'instances.sudokus')
+            instance_store.convert('data/new_instances_25_30_35_40.json', path)
+            store = instance_store.InstanceStore(path)
+            dataset = store.to_dataset()
+            self.assertEqual(len(store), 200)
+            self.assertEqual(sum(len(level) for level in dataset.values()), 200)
+            puzzles = [instance['puzzle'] for level in dataset.values() for instance in level[:10]]
+            self.assertTrue(np.array_equal(puzzles, self.puzzles))
+            hard = dataset['hard25'][7]
+            self.assertEqual(store.find(hard['hash']), hard['id'])
+            self.assertTrue((store.clues[store.select(tier='hard25')] == 25).all())
+            del store, dataset
+
+    def test_instance_store_keeps_ids_of_files_without_hash(self):
+        source = tools.load_instances('data/old_instances_25_30_35.json')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'old_instances.sudokus')
+            instance_store.convert('data/old_instances_25_30_35.json', path)
+            store = instance_store.InstanceStore(path)
+            dataset = store.to_dataset()
+            self.assertEqual(list(dataset.keys()), list(source.keys()))
+            for level, instances in source.items():
+                self.assertEqual([instance['id'] for instance in dataset[level]],
+                                 [instance['id'] for instance in instances])
+                self.assertTrue(np.array_equal([instance['puzzle'] for instance in dataset[level]],
+                                               [instance['puzzle'] for instance in instances]))
+            self.assertFalse(store.hashes.any())
+            del store, dataset
+
+
+if __name__ == '__main__':
+    unittest.main()
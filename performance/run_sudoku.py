@@ -8,14 +8,19 @@ from multiprocessing import Pool
 from evolutionary import config, algorithm
 
 
+RESULTS_STORE = 'results/results.sqlite'
+
+
 def test_sudoku_instance(sudoku_problem_instance, n):
-    Path(f"results/{sudoku_problem_instance.id}").mkdir(parents=True, exist_ok=True)
+    Path('results').mkdir(parents=True, exist_ok=True)
     cfg = config.EvolutionConfig(
         clues=sudoku_problem_instance.clues,
         id=sudoku_problem_instance.id,
         sudoku_instance=np.array(sudoku_problem_instance.puzzle),
         max_iterations=4000,
-        population_size=150
+        population_size=150,
+        results_store=RESULTS_STORE,
+        compress_trace=True
     )
     with Pool(5) as p:
         p.map(algorithm.run, [cfg for _ in range(n)])
@@ -0,0 +1,167 @@
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import tools
+from evaluation import validate_sudoku
+
+
+# how often race checks for solvers which died without result
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class PortfolioSolver:
+    name: str
+    engine: str  # 'dfs', 'bitboard', 'dlx' or 'evolutionary'
+    params: dict = field(default_factory=dict)
+
+
+@dataclass
+class PortfolioResult:
+    solver: Optional[PortfolioSolver]
+    solution: Optional[np.ndarray]
+    time: float
+    errors: Dict[str, str] = field(default_factory=dict)  # solver name: traceback or exit code of failed solver
+
+
+DefaultPortfolio: List[PortfolioSolver] = [
+    PortfolioSolver('dfs', 'dfs'),
+    PortfolioSolver('bitboard', 'bitboard'),
+    PortfolioSolver('dlx', 'dlx'),
+    PortfolioSolver('evolutionary_150', 'evolutionary', {'population_size': 150, 'max_iterations': 20000}),
+    PortfolioSolver('evolutionary_500', 'evolutionary', {'population_size': 500, 'max_iterations': 20000}),
+    PortfolioSolver('evolutionary_prefill', 'evolutionary',
+                    {'population_size': 150, 'max_iterations': 20000, 'prefill': True}),
+]
+
+
+def _solve_dfs(puzzle: np.ndarray, params: dict) -> Optional[np.ndarray]:
+    from dfs import improved
+    return improved.solve(np.copy(puzzle))
+
+
+def _solve_bitboard(puzzle: np.ndarray, params: dict) -> Optional[np.ndarray]:
+    from dfs import bitboard
+    return bitboard.solve(puzzle)
+
+
+def _solve_dlx(puzzle: np.ndarray, params: dict) -> Optional[np.ndarray]:
+    from dfs import dlx
+    return dlx.solve(puzzle)
+
+
+def _solve_evolutionary(puzzle: np.ndarray, params: dict) -> Optional[np.ndarray]:
+    from evolutionary import algorithm, config
+    cfg = config.EvolutionConfig(sudoku_instance=puzzle, id=params.get('id', 0), clues=np.count_nonzero(puzzle),
+                                 max_iterations=params.get('max_iterations', 20000),
+                                 population_size=params.get('population_size', 150),
+                                 prefill=params.get('prefill', False))
+    sudoku, fitness = algorithm.solve(cfg)
+    return sudoku if fitness == 0 else None
+
+
+engines = {
+    'dfs': _solve_dfs,
+    'bitboard': _solve_bitboard,
+    'dlx': _solve_dlx,
+    'evolutionary': _solve_evolutionary,
+}
+
+
+def is_solution_of(solution: Optional[np.ndarray], puzzle: np.ndarray) -> bool:
+    if solution is None or np.shape(solution) != puzzle.shape:
+        return False
+    fixed = puzzle > 0
+    return bool((solution[fixed] == puzzle[fixed]).all()) and validate_sudoku(solution)
+
+
+def _worker(index: int, solver: PortfolioSolver, puzzle: np.ndarray, results) -> None:
+    np.random.seed()  # forked solvers would otherwise share random state
+    try:
+        results.put((index, engines[solver.engine](puzzle, solver.params), None))
+    except Exception:
+        results.put((index, None, traceback.format_exc()))
+
+
+def _died(processes: list, finished: set, results, errors: dict, solvers: List[PortfolioSolver]) -> list:
+    """
+    Solvers killed by a signal or crashed in native code exit without putting their result,
+    they are marked as finished with their exit code in errors
+    :return: results put by exited solvers which are still in the queue
+    """
+    exited = [index for index, process in enumerate(processes)
+              if index not in finished and process.exitcode is not None]
+    messages = []
+    while len(exited) > 0:
+        try:
+            messages.append(results.get_nowait())
+        except queue.Empty:
+            break
+    reported = {index for index, _, _ in messages}
+    for index in exited:
+        if index not in reported:
+            finished.add(index)
+            errors[solvers[index].name] = f'exited with code {processes[index].exitcode} without result'
+    return messages
+
+
+def race(puzzle: np.ndarray, solvers: List[PortfolioSolver] = None, timeout: float = None) -> PortfolioResult:
+    """
+    Runs all solvers on the same puzzle at once, each one in its own process.
+    First verified solution wins and remaining solvers are terminated.
+    :return: winning solver and its solution, both are None if no solver succeeded in time;
+    tracebacks of solvers which crashed before the race ended and exit codes of solvers which died
+    without result are kept in errors
+    :raises RuntimeError: if no solver succeeded and some of them crashed
+    """
+    solvers = DefaultPortfolio if solvers is None else solvers
+    results = mp.Queue()
+    processes = [mp.Process(target=_worker, args=(index, solver, puzzle, results), daemon=True)
+                 for index, solver in enumerate(solvers)]
+
+    start = time.time()
+    winner = PortfolioResult(None, None, 0.0)
+    finished = set()  # indexes of solvers which reported or died
+    try:
+        for process in processes:
+            process.start()
+        while len(finished) < len(processes) and winner.solver is None:
+            remaining = None if timeout is None else timeout - (time.time() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                messages = [results.get(timeout=POLL_INTERVAL if remaining is None else min(remaining, POLL_INTERVAL))]
+            except queue.Empty:
+                messages = _died(processes, finished, results, winner.errors, solvers)
+            for index, solution, error in messages:
+                finished.add(index)
+                if error is not None:
+                    winner.errors[solvers[index].name] = error
+                if winner.solver is None and is_solution_of(solution, puzzle):
+                    winner = PortfolioResult(solvers[index], solution, time.time() - start, winner.errors)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    if winner.solver is None:
+        winner.time = time.time() - start
+        if len(winner.errors) > 0:
+            raise RuntimeError('no solver succeeded, crashed solvers:\n' + '\n'.join(
+                f'{name}:\n{error}' for name, error in winner.errors.items()))
+    return winner
+
+
+if __name__ == '__main__':
+    instances = tools.load_instances('data/new_instances_25_30_35_40.json')
+    for instance in instances['hard25'][:10]:
+        result = race(instance['puzzle'])
+        name = None if result.solver is None else result.solver.name
+        print(f'instance #{instance["id"]}: solved by {name} in {result.time}s')
@@ -0,0 +1,80 @@
+import multiprocessing as mp
+import os
+import signal
+import time
+import unittest
+from unittest import mock
+
+import portfolio
+import tools
+from portfolio import PortfolioSolver
+
+
+def _sleep(puzzle, params):
+    time.sleep(params['seconds'])
+
+
+def _crash(puzzle, params):
+    raise ValueError('solver failed')
+
+
+def _slow_bitboard(puzzle, params):
+    time.sleep(params['seconds'])
+    return portfolio.engines['bitboard'](puzzle, params)
+
+
+def _killed(puzzle, params):
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+class PortfolioTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        instances = tools.load_instances('data/new_instances_25_30_35_40.json')
+        self.puzzle = instances['hard25'][0]['puzzle']
+
+    def assertProcessesFinished(self):
+        self.assertEqual(mp.active_children(), [])
+
+    def test_exact_solver_wins_race(self):
+        solvers = [PortfolioSolver('sleep', 'sleep', {'seconds': 30}), PortfolioSolver('bitboard', 'bitboard'),
+                   PortfolioSolver('dlx', 'dlx')]
+        with mock.patch.dict(portfolio.engines, {'sleep': _sleep}):
+            result = portfolio.race(self.puzzle, solvers, timeout=20)
+        self.assertIn(result.solver.name, ('bitboard', 'dlx'))
+        self.assertTrue(portfolio.is_solution_of(result.solution, self.puzzle))
+        self.assertLess(result.time, 20)
+        self.assertProcessesFinished()
+
+    def test_race_without_winner_stops_at_timeout(self):
+        solvers = [PortfolioSolver('sleep', 'sleep', {'seconds': 30})]
+        with mock.patch.dict(portfolio.engines, {'sleep': _sleep}):
+            result = portfolio.race(self.puzzle, solvers, timeout=0.5)
+        self.assertIsNone(result.solver)
+        self.assertIsNone(result.solution)
+        self.assertGreaterEqual(result.time, 0.5)
+        self.assertLess(result.time, 10)
+        self.assertProcessesFinished()
+
+    def test_race_reports_crashed_solvers(self):
+        with mock.patch.dict(portfolio.engines, {'crash': _crash, 'slow_bitboard': _slow_bitboard}):
+            with self.assertRaisesRegex(RuntimeError, 'solver failed'):
+                portfolio.race(self.puzzle, [PortfolioSolver('crash', 'crash')], timeout=20)
+            result = portfolio.race(self.puzzle, [PortfolioSolver('crash', 'crash'),
+                                                  PortfolioSolver('bitboard', 'slow_bitboard', {'seconds': 0.5})],
+                                    timeout=20)
+        self.assertEqual(result.solver.name, 'bitboard')
+        self.assertIn('crash', result.errors)
+        self.assertProcessesFinished()
+
+    def test_race_without_timeout_ends_when_solver_dies(self):
+        with mock.patch.dict(portfolio.engines, {'killed': _killed}):
+            with self.assertRaisesRegex(RuntimeError, 'exited with code -9'):
+                portfolio.race(self.puzzle, [PortfolioSolver('killed', 'killed')])
+            result = portfolio.race(self.puzzle, [PortfolioSolver('killed', 'killed'), PortfolioSolver('dlx', 'dlx')])
+        self.assertEqual(result.solver.name, 'dlx')
+        self.assertProcessesFinished()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import argparse
+import os
+import pathlib
+import sqlite3
+import time
+
+import jsonpickle
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    instance_id INTEGER NOT NULL,
+    clues INTEGER,
+    name TEXT,
+    finished REAL,
+    finished_normally INTEGER,
+    exception_type TEXT,
+    error TEXT,
+    generations INTEGER,
+    time REAL,
+    score INTEGER,
+    solution BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_instance_id ON runs (instance_id);
+CREATE TABLE IF NOT EXISTS traces (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (id),
+    times BLOB,
+    scores BLOB,
+    generations BLOB  -- generations of points of compressed traces, NULL if there is point for every generation
+);
+"""
+
+
+def _blob(values, dtype) -> bytes:
+    return np.asarray(values, dtype=dtype).tobytes()
+
+
+class ResultsStore:
+    """
+    Results of all runs of an experiment in a single SQLite file, replaces one jsonpickle file per run.
+    Run metadata and solutions are kept in 'runs' table indexed by instance id, partial times and scores
+    (or points of compressed trace) are packed into typed arrays in 'traces' table, so queries over runs
+    do not read them.
+    Many processes can write to the same file, every add is a single transaction.
+    """
+
+    def __init__(self, path: str, timeout: float = 60):
+        self.path: str = path
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add(self, result: dict, name: str = None, finished: float = None) -> None:
+        """
+        :param result: result in format written by SolutionTracer
+        """
+        self.add_many([(result, name, finished)])
+
+    def add_many(self, results) -> None:
+        """
+        :param results: iterable of (result, name, finished) tuples, all of them are written in one transaction
+        """
+        with self.connection:
+            for result, name, finished in results:
+                self._insert(result, name, time.time() if finished is None else finished)
+
+    def _insert(self, result: dict, name: str, finished: float) -> None:
+        status = result['Exit status']
+        if 'Trace' in result:
+            times, scores = result['Trace']['times'], result['Trace']['scores']
+            generations = _blob(result['Trace']['generations'], np.int32)
+            number_of_generations = result['Generations']
+        else:
+            times = result.get('Partial times', [])
+            scores = [score[0] for score in result.get('Partial scores', [])]
+            generations = None
+            number_of_generations = len(scores)
+        solution = result.get('Solution')
+        cursor = self.connection.execute(
+            'INSERT INTO runs (instance_id, clues, name, finished, finished_normally, exception_type, error, '
+            'generations, time, score, solution) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (result.get('Id'), result.get('Clues'), name, finished, status['Finished normally'],
+             status['Exception type'], result.get('Error'), number_of_generations,
+             float(times[-1]) if len(times) > 0 else None, int(scores[-1]) if len(scores) > 0 else None,
+             None if solution is None else _blob(solution, np.uint8)))
+        self.connection.execute('INSERT INTO traces (run_id, times, scores, generations) VALUES (?, ?, ?, ?)',
+                                (cursor.lastrowid, _blob(times, np.float64), _blob(scores, np.int32), generations))
+
+    def instance_ids(self) -> list:
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT instance_id FROM runs ORDER BY 1')]
+
+    def get_instances_results(self, instances_filter=lambda x: True) -> dict:
+        """
+        :param instances_filter: filter of instance ids as strings, like names of directories of results
+        :return: {instance id: [results]} in format of analysis.get_instances_results, with numpy arrays
+        as partial times, partial scores (shape (n, 1), like fitness tuples), trace points and solution;
+        runs which ended without solution are skipped
+        """
+        ids = [instance_id for instance_id in self.instance_ids() if instances_filter(str(instance_id))]
+        results = {str(instance_id): [] for instance_id in ids}
+        if len(ids) == 0:
+            return results
+        rows = self.connection.execute(
+            'SELECT runs.instance_id, runs.clues, runs.finished_normally, runs.exception_type, runs.solution, '
+            'runs.generations, traces.times, traces.scores, traces.generations '
+            'FROM runs JOIN traces ON traces.run_id = runs.id '
+            'WHERE runs.solution IS NOT NULL AND runs.instance_id IN ({}) ORDER BY runs.id'.format(
+                ', '.join('?' * len(ids))), ids)
+        for instance_id, clues, finished_normally, exception_type, solution, number_of_generations, times, scores, \
+                generations in rows:
+            result = {
+                'Exit status': {
+                    'Finished normally': bool(finished_normally),
+                    'Exception type': exception_type,
+                },
+                'Solution': _grid(solution),
+                'Id': instance_id,
+                'Clues': clues,
+            }
+            if generations is None:
+                result['Partial times'] = np.frombuffer(times, dtype=np.float64)
+                result['Partial scores'] = np.frombuffer(scores, dtype=np.int32).reshape(-1, 1)
+            else:
+                result['Trace'] = {
+                    'times': np.frombuffer(times, dtype=np.float64),
+                    'generations': np.frombuffer(generations, dtype=np.int32),
+                    'scores': np.frombuffer(scores, dtype=np.int32),
+                }
+                result['Generations'] = number_of_generations
+            results[str(instance_id)].append(result)
+        return results
+
+
+def _grid(blob: bytes) -> np.ndarray:
+    numbers = np.frombuffer(blob, dtype=np.uint8).astype(int)
+    size = int(round(len(numbers) ** 0.5))
+    return numbers.reshape(size, size)
+
+
+def is_store(path) -> bool:
+    return os.path.isfile(path)
+
+
+def import_directory(rootdir: str, store: ResultsStore, batch_size: int = 1000) -> int:
+    """
+    Moves results written as one jsonpickle file per run (results/{id}/{name}_{time}) into store
+    :return: amount of imported runs
+    """
+    root = pathlib.Path(rootdir)
+    batch = []
+    imported = 0
+    for instance_dir in sorted(root.iterdir()):
+        if not instance_dir.is_dir():
+            continue
+        for file in sorted(instance_dir.iterdir()):
+            try:
+                result = jsonpickle.decode(file.read_text())
+            except ValueError:
+                continue
+            name, _, finished = file.name.rpartition('_')
+            try:
+                finished = float(finished)
+            except ValueError:
+                name, finished = file.name, file.stat().st_mtime
+            result.setdefault('Id', int(instance_dir.name))
+            batch.append((result, name, finished))
+            if len(batch) == batch_size:
+                store.add_many(batch)
+                imported += len(batch)
+                batch = []
+    store.add_many(batch)
+    return imported + len(batch)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Imports directory of jsonpickle results into results store')
+    parser.add_argument('input', help='directory of results, e.g. output/results')
+    parser.add_argument('output', help='results store file, e.g. output/results.sqlite')
+    args = parser.parse_args()
+
+    with ResultsStore(args.output) as results_store:
+        print(f'{import_directory(args.input, results_store)} runs imported into {args.output}')
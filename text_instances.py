@@ -0,0 +1,216 @@
+import argparse
+import heapq
+import json
+import os
+from typing import Iterable, Iterator
+
+import numpy as np
+
+import instance_store
+
+GRID_CHARACTERS = set('0123456789.')
+
+# column names used by common puzzle collections
+PUZZLE_COLUMNS = ('puzzle', 'quizzes', 'quiz')
+SOLUTION_COLUMNS = ('solution', 'solutions')
+RATING_COLUMNS = ('difficulty', 'rating')
+
+# difficulty ranges of dataset_maker.ipynb
+DefaultLevels = {
+    'easy': (0, 3),
+    'medium': (3, 6),
+    'hard': (6, 9),
+}
+
+
+def is_grid(text: str) -> bool:
+    return len(text) == 81 and set(text) <= GRID_CHARACTERS
+
+
+def parse_grid(text: str) -> np.ndarray:
+    """
+    :param text: 81 characters, '.' or '0' marks empty cell
+    :return: sudoku of shape (9, 9)
+    """
+    return (np.frombuffer(text.replace('.', '0').encode(), dtype=np.uint8) - ord('0')).astype(int).reshape(9, 9)
+
+
+def _split(line: str) -> list:
+    return line.split(',') if ',' in line else line.split()
+
+
+def read_instances(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parses line-oriented puzzle formats one line at a time: csv files with a header (e.g. the 3 million puzzles
+    Kaggle set: id,puzzle,solution,clues,difficulty) or lines of puzzle, optional solution and optional rating
+    separated by commas or whitespace. Lines starting with '#' are skipped.
+    :return: generator of instances with 'puzzle', 'solution', 'clues', 'difficulty' and 'id'
+    """
+    columns = None
+    for number, line in enumerate(lines):
+        line = line.strip()
+        if len(line) == 0 or line.startswith('#'):
+            continue
+        fields = _split(line)
+        if columns is None and not any(is_grid(field) for field in fields):
+            columns = [field.strip().lower() for field in fields]
+            continue
+
+        if columns is not None:
+            record = dict(zip(columns, fields))
+            puzzle = next((record[name] for name in PUZZLE_COLUMNS if name in record), None)
+            solution = next((record[name] for name in SOLUTION_COLUMNS if name in record), None)
+            rating = next((record[name] for name in RATING_COLUMNS if name in record), None)
+        else:
+            record = {}
+            grids = [field for field in fields if is_grid(field)]
+            rest = [field for field in fields if not is_grid(field)]
+            puzzle = grids[0]
+            solution = grids[1] if len(grids) > 1 else None
+            rating = rest[-1] if len(rest) > 0 else None
+
+        grid = parse_grid(puzzle)
+        instance = {
+            'id': int(record['id']) if 'id' in record else number,
+            'puzzle': grid,
+            'solution': parse_grid(solution) if solution else None,
+            'clues': int(record['clues']) if 'clues' in record else int(np.count_nonzero(grid)),
+            'difficulty': float(rating) if rating else float('nan'),
+        }
+        if 'level' in record:
+            instance['level'] = record['level']
+        yield instance
+
+
+def read_file(path: str) -> Iterator[dict]:
+    """
+    :return: generator of instances of text file, the file is read lazily
+    """
+    with open(path) as file:
+        yield from read_instances(file)
+
+
+def filter_instances(instances: Iterable[dict], clues: tuple = None, difficulty: tuple = None) -> Iterator[dict]:
+    """
+    :param clues: [min, max] amount of clues
+    :param difficulty: [min, max) difficulty, like ranges of dataset_maker.ipynb
+    """
+    for instance in instances:
+        if clues is not None and not clues[0] <= instance['clues'] <= clues[1]:
+            continue
+        if difficulty is not None and not difficulty[0] <= instance['difficulty'] < difficulty[1]:
+            continue
+        yield instance
+
+
+def _order(instance: dict) -> tuple:
+    # order of dataset_maker.ipynb: easier first, more clues first within the same difficulty
+    difficulty = instance['difficulty']
+    return 0.0 if difficulty != difficulty else difficulty, -instance['clues']
+
+
+class Sampler:
+    """
+    Selects limit instances from a stream in a single pass and keeps at most limit instances in memory
+    selection: 'bottom' - the easiest instances, 'top' - the hardest ones, 'uniform' - random sample
+    (reservoir sampling) which spreads over the whole range of difficulty like evenly spaced picks of the notebook
+    """
+
+    def __init__(self, limit: int, selection: str = 'top', rng: np.random.RandomState = None):
+        if selection not in ('top', 'bottom', 'uniform'):
+            raise ValueError(f'unknown selection: {selection}')
+        self.limit: int = limit
+        self.selection: str = selection
+        self.rng: np.random.RandomState = np.random.RandomState() if rng is None else rng
+        self.seen: int = 0
+        self._items = []  # heap of (key, sequence, instance) or reservoir of instances
+
+    def add(self, instance: dict) -> None:
+        if self.selection == 'uniform':
+            if self.seen < self.limit:
+                self._items.append(instance)
+            else:
+                index = self.rng.randint(self.seen + 1)
+                if index < self.limit:
+                    self._items[index] = instance
+        else:
+            key = _order(instance)
+            if self.selection == 'bottom':
+                key = tuple(-value for value in key)
+            item = (key, self.seen, instance)
+            if len(self._items) < self.limit:
+                heapq.heappush(self._items, item)
+            elif item > self._items[0]:
+                heapq.heapreplace(self._items, item)
+        self.seen += 1
+
+    def result(self) -> list:
+        """
+        :return: selected instances sorted by difficulty, then by descending amount of clues
+        """
+        instances = self._items if self.selection == 'uniform' else [instance for _, _, instance in self._items]
+        return sorted(instances, key=_order)
+
+
+def sample(instances: Iterable[dict], limit: int, selection: str = 'top', seed: int = None) -> list:
+    """
+    :return: limit instances selected with Sampler
+    """
+    sampler = Sampler(limit, selection, np.random.RandomState(seed))
+    for instance in instances:
+        sampler.add(instance)
+    return sampler.result()
+
+
+def make_dataset(path: str, levels: dict = None, limit: int = 50, selection: str = 'top', clues: tuple = None,
+                 seed: int = None) -> dict:
+    """
+    Streaming counterpart of dataset_maker.ipynb, all levels are selected in a single pass over the file
+    :param levels: {level name: [min, max) difficulty}, DefaultLevels if not given
+    :return: {level name: [instances]}, like result of tools.load_instances
+    """
+    levels = DefaultLevels if levels is None else levels
+    rng = np.random.RandomState(seed)
+    samplers = {level: Sampler(limit, selection, rng) for level in levels}
+    for instance in filter_instances(read_file(path), clues):
+        level = next((name for name, (low, high) in levels.items() if low <= instance['difficulty'] < high), None)
+        if level is not None:
+            instance['level'] = level
+            samplers[level].add(instance)
+    return {level: sampler.result() for level, sampler in samplers.items()}
+
+
+def _to_json(instance: dict) -> dict:
+    return {key: value.tolist() if isinstance(value, np.ndarray) else value
+            for key, value in instance.items() if value is not None}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Selects instances from a puzzle text file (e.g. sudoku-3m.csv)')
+    parser.add_argument('input', help='text file with one puzzle per line')
+    parser.add_argument('-o', '--output', help='json dataset file or instance store if it ends with .sudokus, '
+                                               'default: <input>.json')
+    parser.add_argument('-l', '--limit', type=int, default=50, help='amount of instances of every level')
+    parser.add_argument('-s', '--selection', choices=['top', 'bottom', 'uniform'], default='top')
+    parser.add_argument('--all', action='store_true', help='convert every instance, without levels and selection')
+    parser.add_argument('--clues', type=int, nargs=2, default=None, help='min and max amount of clues')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    output = args.output or '{}.json'.format(os.path.splitext(args.input)[0])
+    if args.all:
+        instances = filter_instances(read_file(args.input), args.clues)
+        if output.endswith('.sudokus'):
+            instance_store.write(output, instances)
+        else:
+            with open(output, 'w') as f:
+                json.dump({'all': [_to_json(instance) for instance in instances]}, f)
+    else:
+        dataset = make_dataset(args.input, limit=args.limit, selection=args.selection, clues=args.clues,
+                               seed=args.seed)
+        if output.endswith('.sudokus'):
+            instance_store.write(output, (instance for level in dataset.values() for instance in level))
+        else:
+            with open(output, 'w') as f:
+                json.dump({level: [_to_json(instance) for instance in instances]
+                           for level, instances in dataset.items()}, f)
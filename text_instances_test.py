@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+import text_instances
+import tools
+
+
+class TextInstancesTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        instances = tools.load_instances('data/new_instances_25_30_35_40.json')
+        self.puzzles = [instance['puzzle'] for level in instances.values() for instance in level[:10]]
+
+    def test_text_instances_reading_and_sampling(self):
+        lines = ['id,puzzle,solution,clues,difficulty']
+        for i, puzzle in enumerate(self.puzzles):
+            text = ''.join(map(str, puzzle.flatten())).replace('0', '.')
+            lines.append(f'{i},{text},{"1" * 81},{np.count_nonzero(puzzle)},{i % 9}')
+        instances = list(text_instances.read_instances(lines))
+        self.assertTrue(np.array_equal([instance['puzzle'] for instance in instances], self.puzzles))
+        top = text_instances.sample(iter(instances), 5, 'top')
+        self.assertEqual([instance['difficulty'] for instance in top], [7.0, 8.0, 8.0, 8.0, 8.0])
+        bottom = text_instances.sample(text_instances.filter_instances(instances, clues=(30, 30)), 3, 'bottom')
+        self.assertEqual([(instance['difficulty'], instance['clues']) for instance in bottom],
+                         [(0, 30), (1, 30), (2, 30)])
+        self.assertEqual(len(text_instances.sample(iter(instances), 7, 'uniform', seed=0)), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,12 @@ import math
 import time
 import types
 from contextlib import contextmanager
-from copy import deepcopy
 
 import jsonpickle as jsonpickle
 import numpy as np
 
+from results_store import ResultsStore
+
 
 def load_instances(filename):
     dataset = None
@@ -64,29 +65,110 @@ class Timer:
         print('{} so far: {}s'.format(self._name, self.elapsed))
 
 
+class Trace:
+    """
+    Improvement-only trace, keeps (time, generation, score) points in which score changed
+    in preallocated typed arrays. When capacity is reached every second point but the last one is dropped,
+    so memory does not grow with number of generations.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(capacity, 3)
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.generations = np.empty(capacity, dtype=np.int32)
+        self.scores = np.empty(capacity, dtype=np.int32)
+        self.length = 0
+        self.generation = 0  # number of appended generations
+        self.last_time = None
+        self._last_score = None
+
+    def append(self, score: int, time: float) -> None:
+        if score != self._last_score:
+            self._last_score = score
+            if self.length == len(self.scores):
+                self._compact()
+            self.times[self.length] = time
+            self.generations[self.length] = self.generation
+            self.scores[self.length] = score
+            self.length += 1
+        self.generation += 1
+        self.last_time = time
+
+    def _compact(self) -> None:
+        kept = np.append(np.arange(0, self.length - 1, 2), self.length - 1)
+        for column in (self.times, self.generations, self.scores):
+            column[:len(kept)] = column[kept]
+        self.length = len(kept)
+
+    def points(self) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        :return: times, generations and scores of points, with the last generation as final point
+        """
+        times, generations, scores = (column[:self.length] for column in (self.times, self.generations, self.scores))
+        if self.length > 0 and generations[-1] != self.generation - 1:
+            times = np.append(times, self.last_time)
+            generations = np.append(generations, self.generation - 1)
+            scores = np.append(scores, scores[-1])
+        return np.copy(times), np.copy(generations), np.copy(scores)
+
+
 class SolutionTracer:
-    def __init__(self, filename: str, id: int, clues: int, collect_partial: bool = True, max_repetitions: int = 1000):
+    def __init__(self, filename: str, id: int, clues: int, collect_partial: bool = True, max_repetitions: int = 1000,
+                 store: str = None, compress: bool = False, max_points: int = 1024):
+        """
+        :param filename: name of the run, prefix of result file
+        :param store: path of ResultsStore, result is added to it instead of being written
+        to results/{id}/{filename}_{time}
+        :param compress: keep only points in which score changed (Trace) instead of score and time of every
+        generation, at most max_points of them
+        """
         self.filename = filename
+        self.store = store
         self.collect_partial = collect_partial
-        self.best = None
+        self.compress = compress
+        self.best_score = math.inf
         self.best_time = math.inf
+        self._best_genome = None  # preallocated when the first solution comes
+        self._best_shape = None
         self.times = []
         self.scores = []
+        self.trace = Trace(max_points) if compress else None
+        self._last_score = None
         self.repetitions = 0
         self.max_repetitions = max_repetitions
         self.id = id
         self.clues = clues
 
     def update(self, solution, time):
+        self.record(solution.fitness.values[0], time, solution.sudoku)
+
+    def record(self, score, time, sudoku):
+        """
+        Same as update, but takes score and sudoku (or flat genome) of the best solution directly,
+        so caller does not have to build an individual
+        """
         if self.collect_partial:
-            if len(self.scores) != 0:
-                self.repetitions = self.repetitions + 1 if self.scores[-1] == solution.fitness.values else 0
-            self.scores.append(solution.fitness.values)
-            self.times.append(time)
-        if self.best is None or solution.fitness.values < self.best.fitness.values:
-            self.best = deepcopy(solution)
+            self.repetitions = self.repetitions + 1 if self._last_score == score else 0
+            self._last_score = score
+            if self.compress:
+                self.trace.append(score, time)
+            else:
+                self.scores.append((score,))
+                self.times.append(time)
+        if score < self.best_score:
+            if self._best_genome is None:
+                self._best_genome = np.empty(np.size(sudoku), dtype=np.uint8)
+                self._best_shape = np.shape(sudoku)
+            self._best_genome[:] = np.ravel(sudoku)
+            self.best_score = score
             self.best_time = time
 
+    @property
+    def best_sudoku(self):
+        if self._best_genome is None:
+            return None
+        return self._best_genome.reshape(self._best_shape).astype(int)
+
     @property
     def repetitions_exceeded(self):
         return self.repetitions > self.max_repetitions
@@ -95,34 +177,49 @@ class SolutionTracer:
         return self
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
-        try:
+        if self._best_genome is not None:
             result = {
                 "Exit status": {
                     "Finished normally": exc_type is None,
                     'Exception type': str(exc_type),
                 },
-                "Partial times": self.times,
-                "Partial scores": self.scores,
-                "Solution": self.best.sudoku.tolist(),
+                "Solution": self.best_sudoku.tolist(),
                 "Id": self.id,
                 "Clues": self.clues
             }
-        except AttributeError:
+            if self.compress:
+                times, generations, scores = self.trace.points()
+                result["Trace"] = {
+                    "times": times.tolist(),
+                    "generations": generations.tolist(),
+                    "scores": scores.tolist(),
+                }
+                result["Generations"] = self.trace.generation
+            else:
+                result["Partial times"] = self.times
+                result["Partial scores"] = self.scores
+        else:
             result = {
                 "Exit status": {
                     'Finished normally': exc_type is None,
                     'Exception type': str(exc_type)
                 },
-                'Error': 'No best chromosome set'
+                'Error': 'No best chromosome set',
+                "Id": self.id,
+                "Clues": self.clues
             }
+        if self.store is not None:
+            with ResultsStore(self.store) as store:
+                store.add(result, self.filename)
+            return
         print(result)
         file_name = "{}_{}".format(self.filename, time.time())
         with open('results/{}/{}'.format(self.id, file_name), mode='w') as file:
             file.write(jsonpickle.encode(result))
 
     def __str__(self):
-        return '<SolutionTracer' + '\n\tbest solution: {}'.format(self.best) + '\n\ttime: {:.3f}s'.format(
-            self.best_time) + '\n\tcost: {:.3f}'.format(self.best.value) + '\n>'
+        return '<SolutionTracer' + '\n\tbest solution: {}'.format(self.best_sudoku) + '\n\ttime: {:.3f}s'.format(
+            self.best_time) + '\n\tcost: {:.3f}'.format(self.best_score) + '\n>'
 
     def print(self):
         print(str(self))